@@ -0,0 +1,150 @@
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from manim import config, tempconfig
+
+import gallery
+
+# Renders each gallery scene without writing any file and times it, so
+# changes to the scene code can be checked against a stored baseline
+
+DEFAULT_BASELINE = os.path.join(gallery.MAIN_DIR, "benchmark_baseline.json")
+QUALITIES = {
+	"l": "low_quality",
+	"m": "medium_quality",
+	"h": "high_quality",
+}
+TIMED_METRICS = ["construct_time", "update_mean", "update_p95"]
+# Differences below this many seconds are noise, whatever the ratio
+MIN_REGRESSION = 0.005
+
+def load_scene_class(scene):
+	module_name = os.path.splitext(os.path.basename(scene.file_name))[0]
+	spec = importlib.util.spec_from_file_location(f"benchmark_{module_name}", scene.file_name)
+	module = importlib.util.module_from_spec(spec)
+	# Registered the way manim does it, so inspect can find the source of
+	# the scene's classes
+	sys.modules[spec.name] = module
+	spec.loader.exec_module(module)
+	return getattr(module, scene.name)
+
+def benchmark_scene(scene, quality):
+	scene_class = load_scene_class(scene)
+	# Every run starts from empty mesh, trajectory and glyph caches, so
+	# the code that fills them is what gets timed. LaTeX's output is kept
+	# in the usual place, compiling it is not the scenes' doing
+	module = sys.modules[scene_class.__module__]
+	if hasattr(module, "mesh_cache"):
+		module.mesh_cache.meshes.clear()
+	tex_dir = str(config.get_dir("tex_dir"))
+	with tempfile.TemporaryDirectory() as media_dir, tempconfig({
+		"quality": QUALITIES[quality],
+		"dry_run": True,
+		"disable_caching": True,
+		"verbosity": "WARNING",
+		"media_dir": media_dir,
+		"tex_dir": tex_dir,
+	}):
+		instance = scene_class()
+		update_times = []
+		construct_times = []
+		update_to_time = instance.update_to_time
+		construct = instance.construct
+
+		def timed_update_to_time(t):
+			start = time.perf_counter()
+			update_to_time(t)
+			update_times.append(time.perf_counter() - start)
+
+		def timed_construct():
+			start = time.perf_counter()
+			construct()
+			construct_times.append(time.perf_counter() - start)
+
+		instance.update_to_time = timed_update_to_time
+		instance.construct = timed_construct
+		instance.render()
+
+	update_times = np.array(update_times or [0.0])
+	return {
+		"construct_time": sum(construct_times),
+		"update_mean": float(update_times.mean()),
+		"update_p95": float(np.percentile(update_times, 95)),
+		"n_frames": len(update_times),
+		"num_plays": instance.renderer.num_plays,
+	}
+
+def get_regressions(results, baseline, threshold):
+	regressions = []
+	for name, result in results.items():
+		if name not in baseline:
+			continue
+		for metric in TIMED_METRICS:
+			old, new = baseline[name][metric], result[metric]
+			if new > old * (1 + threshold) and new - old > MIN_REGRESSION:
+				regressions.append((name, metric, old, new))
+	return regressions
+
+def get_parser():
+	parser = argparse.ArgumentParser(
+		description="Time the gallery scenes headlessly and compare them with a baseline"
+	)
+	parser.add_argument("scenes", nargs="*", help="names of the scenes to run, all of them by default")
+	parser.add_argument("-q", "--quality", default="l", choices=list(QUALITIES))
+	parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+	parser.add_argument(
+		"--threshold", type=float, default=0.25,
+		help="fraction a timing may grow over the baseline before it counts as a regression"
+	)
+	parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+	return parser
+
+def main():
+	args = get_parser().parse_args()
+	scenes = gallery.find_scenes()
+	if args.scenes:
+		scenes = [scene for scene in scenes if scene.name in args.scenes]
+
+	results = {}
+	for scene in scenes:
+		name = f"{os.path.basename(scene.file_name)}:{scene.name}"
+		results[name] = benchmark_scene(scene, args.quality)
+		result = results[name]
+		print(
+			f"{name:50} construct {result['construct_time']:7.2f}s  "
+			f"update mean {1000 * result['update_mean']:7.2f}ms  "
+			f"p95 {1000 * result['update_p95']:7.2f}ms  "
+			f"{result['n_frames']:5} frames  {result['num_plays']:3} plays"
+		)
+
+	if args.update_baseline:
+		baseline = {}
+		if os.path.exists(args.baseline):
+			with open(args.baseline) as file:
+				baseline = json.load(file)
+		baseline.update(results)
+		with open(args.baseline, "w") as file:
+			json.dump(baseline, file, indent=4, sort_keys=True)
+		return 0
+
+	if not os.path.exists(args.baseline):
+		print(f"No baseline at {args.baseline}, run with --update-baseline to store one")
+		return 0
+	with open(args.baseline) as file:
+		baseline = json.load(file)
+	regressions = get_regressions(results, baseline, args.threshold)
+	for name, metric, old, new in regressions:
+		print(f"Regression in {name}: {metric} went from {old:.4f}s to {new:.4f}s")
+	for name, result in results.items():
+		if name in baseline and result["num_plays"] != baseline[name]["num_plays"]:
+			print(f"{name} played {result['num_plays']} animations, the baseline {baseline[name]['num_plays']}")
+	return 1 if regressions else 0
+
+if __name__ == "__main__":
+	sys.exit(main())
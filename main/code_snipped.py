@@ -5,11 +5,53 @@ from numpy import linalg as LA
 import functools
 import operator as op
 import math
+import hashlib
+import os
+import shutil
+import inspect
+import tex_cache
+from sphere import get_band_rings
 
 
+def get_bezier_points(curves, alphas):
+	# curves: (..., degree + 1, 3), alphas broadcast against the curve axis
+	degree = curves.shape[-2] - 1
+	alphas = np.asarray(alphas)[..., np.newaxis]
+	result = 0
+	for k in range(degree + 1):
+		coefficient = math.comb(degree, k) * (1 - alphas)**(degree - k) * alphas**k
+		result = result + coefficient * curves[..., np.newaxis, k, :]
+	return result
+
+def get_path_lookup_table(vmobject, n_samples=1000):
+	# Samples the same proportion -> point mapping as
+	# point_from_proportion once, so it can be looked up per frame
+	nppcc = vmobject.n_points_per_cubic_curve
+	n_curves = vmobject.get_num_curves()
+	curves = vmobject.get_points()[:nppcc * n_curves].reshape(n_curves, nppcc, 3)
+
+	# Curve lengths are measured the way get_nth_curve_function_with_length does
+	length_samples = get_bezier_points(curves, np.linspace(0, 1, 10))
+	lengths = LA.norm(np.diff(length_samples, axis=1), axis=2).sum(axis=1)
+	cumulative = np.concatenate([[0], np.cumsum(lengths)])
+
+	proportions = np.linspace(0, 1, n_samples + 1)
+	targets = proportions * cumulative[-1]
+	indices = np.searchsorted(cumulative[1:], targets, side="left")
+	indices = np.minimum(indices, n_curves - 1)
+	residues = np.divide(
+		targets - cumulative[indices], lengths[indices],
+		out=np.zeros(len(targets)), where=lengths[indices] != 0,
+	)
+
+	points = get_bezier_points(curves[indices], residues[:, np.newaxis])[:, 0]
+	speeds = LA.norm(np.diff(points, axis=0), axis=1) / np.diff(proportions)
+	return proportions, points, speeds
+
 class Orbiting(VGroup):
 
 	rate = 7.5
+	n_table_samples = 1000
 
 	def __init__(self, planet, star, ellipse, rate, **kwargs):
 		VGroup.__init__(self, **kwargs)
@@ -18,37 +60,228 @@ class Orbiting(VGroup):
 		self.star = star
 		self.ellipse = ellipse
 		self.rate = rate
+		# The ellipse is assumed to stay put, so its path is tabulated once
+		(
+			self.path_proportions,
+			self.path_points,
+			self.path_speeds,
+		) = get_path_lookup_table(ellipse, self.n_table_samples)
 		# Proportion of the way around the ellipse
 		self.proportion = 0.75
-		planet.move_to(ellipse.point_from_proportion(0.75))
+		planet.move_to(self.point_from_proportion(0.75))
 
 		self.add_updater(lambda m, dt: m.update(dt))
 
+	def get_table_index(self, proportion):
+		index = np.searchsorted(self.path_proportions, proportion, side="right") - 1
+		return min(max(index, 0), len(self.path_speeds) - 1)
+
+	def point_from_proportion(self, proportion):
+		index = self.get_table_index(proportion)
+		p0, p1 = self.path_proportions[index:index + 2]
+		return interpolate(
+			self.path_points[index],
+			self.path_points[index + 1],
+			(proportion - p0) / (p1 - p0),
+		)
+
+	def get_path_speed(self, proportion):
+		# Arc length travelled per unit of proportion
+		return self.path_speeds[self.get_table_index(proportion)]
+
 	def update(self, dt):
         # time = self.internal_time
 
 		planet = self.planet
 		star = self.star
-		ellipse = self.ellipse
 
 		rate = self.rate
 		radius_vector = planet.get_center() - star.get_center()
 		rate *= 1.0 / LA.norm(radius_vector)
 
-		prop = self.proportion
-		d_prop = 0.001
-		ds = LA.norm(op.add(
-			ellipse.point_from_proportion((prop + d_prop) % 1),
-			-ellipse.point_from_proportion(prop),
-		))
-
-		delta_prop = (d_prop / ds) * rate * dt
+		delta_prop = rate * dt / self.get_path_speed(self.proportion)
 
 		self.proportion = (self.proportion + delta_prop) % 1
 		planet.move_to(
-			ellipse.point_from_proportion(self.proportion)
+			self.point_from_proportion(self.proportion)
+		)
+def solve_kepler(mean_anomalies, eccentricity, tolerance=1e-12, max_iterations=50):
+	# Newton's method on E - e*sin(E) = M, for a whole array of M at once
+	mean_anomalies = np.asarray(mean_anomalies, dtype=float)
+	eccentric_anomalies = mean_anomalies + eccentricity * np.sin(mean_anomalies)
+	for x in range(max_iterations):
+		delta = (
+			eccentric_anomalies
+			- eccentricity * np.sin(eccentric_anomalies)
+			- mean_anomalies
+		) / (1 - eccentricity * np.cos(eccentric_anomalies))
+		eccentric_anomalies = eccentric_anomalies - delta
+		if np.max(np.abs(delta)) < tolerance:
+			break
+	return eccentric_anomalies
+
+def get_kepler_positions(times, a, b, focus, period, start_anomaly=-PI / 2):
+	# Positions on an ellipse with semi-axes a, b (major axis along x),
+	# with the attracting body sitting on its right-hand focus
+	e = np.sqrt(a**2 - b**2) / a
+	start_mean_anomaly = start_anomaly - e * np.sin(start_anomaly)
+	mean_anomalies = start_mean_anomaly + TAU * np.asarray(times, dtype=float) / period
+	E = solve_kepler(mean_anomalies, e)
+	offsets = np.zeros((len(E), 3))
+	offsets[:, 0] = a * (np.cos(E) - e)
+	offsets[:, 1] = b * np.sin(E)
+	return np.asarray(focus) + offsets
+
+class KeplerOrbiting(VGroup):
+
+	def __init__(self, planet, a, b, focus, period, duration, **kwargs):
+		VGroup.__init__(self, **kwargs)
+		self.add(planet)
+		self.planet = planet
+		self.a = a
+		self.b = b
+		self.focus = np.array(focus)
+		self.period = period
+		# Positions for every frame of the run, indexed by elapsed time
+		self.frame_rate = config["frame_rate"]
+		n_frames = int(np.ceil(duration * self.frame_rate)) + 1
+		self.trajectory = get_kepler_positions(
+			np.arange(n_frames) / self.frame_rate,
+			a, b, self.focus, period,
+		)
+		self.time = 0
+		planet.move_to(self.trajectory[0])
+
+		self.add_updater(lambda m, dt: m.update(dt))
+
+	def get_position(self, time):
+		index = int(round(time * self.frame_rate))
+		if index < len(self.trajectory):
+			return self.trajectory[index]
+		# Past the precomputed run, fall back to solving for this time
+		return get_kepler_positions(
+			[time], self.a, self.b, self.focus, self.period,
+		)[0]
+
+	def update(self, dt):
+		self.time += dt
+		self.planet.move_to(self.get_position(self.time))
+
+class OrbitalSystem(VGroup):
+
+	rate = 5
+	planet_radius = 0.05
+
+	def __init__(self, star, semi_major_axes, semi_minor_axes,
+		rates=None, angles=None, proportions=None, planet_color=GRAY, **kwargs):
+		VGroup.__init__(self, **kwargs)
+		self.star = star
+		self.star_center = star.get_center()
+
+		# One entry per body, all advanced together in update
+		self.a = np.array(semi_major_axes, dtype=float)
+		self.b = np.array(semi_minor_axes, dtype=float)
+		n_bodies = len(self.a)
+		self.rates = self.get_body_array(rates, self.rate, n_bodies)
+		self.angles = self.get_body_array(angles, 0, n_bodies)
+		# Same starting point as Orbiting: three quarters of the way around
+		self.proportions = self.get_body_array(proportions, 0.75, n_bodies)
+
+		# The star sits on the right-hand focus of every ellipse
+		self.major_directions = np.array([
+			np.cos(self.angles), np.sin(self.angles), np.zeros(n_bodies),
+		]).T
+		self.minor_directions = np.array([
+			-np.sin(self.angles), np.cos(self.angles), np.zeros(n_bodies),
+		]).T
+		c = np.sqrt(self.a**2 - self.b**2)
+		self.centers = self.star_center - c[:, np.newaxis] * self.major_directions
+
+		# Every planet is drawn as a subpath of a single mobject, so moving
+		# them all is one array operation instead of one move_to per body
+		template = Dot(radius=self.planet_radius)
+		self.planet_template = template.get_points() - template.get_center()
+		self.planets = VMobject(
+			fill_color=planet_color, fill_opacity=1, stroke_width=0,
+		)
+		self.add(self.planets)
+		self.update_planet_points()
+
+		self.add_updater(lambda m, dt: m.update(dt))
+
+	def get_body_array(self, values, default, n_bodies):
+		if values is None:
+			return np.full(n_bodies, default, dtype=float)
+		return np.array(values, dtype=float) * np.ones(n_bodies)
+
+	def get_positions(self, proportions=None):
+		if proportions is None:
+			proportions = self.proportions
+		angles = TAU * np.asarray(proportions)
+		return (
+			self.centers
+			+ (self.a * np.cos(angles))[..., np.newaxis] * self.major_directions
+			+ (self.b * np.sin(angles))[..., np.newaxis] * self.minor_directions
+		)
+
+	def get_path_speeds(self):
+		# Arc length travelled per unit of proportion, for every body
+		angles = TAU * self.proportions
+		return TAU * np.sqrt(
+			(self.a * np.sin(angles))**2 + (self.b * np.cos(angles))**2
+		)
+
+	def update(self, dt):
+		radius_vectors = self.get_positions() - self.star_center
+		rates = self.rates / LA.norm(radius_vectors, axis=1)
+
+		delta_props = rates * dt / self.get_path_speeds()
+
+		self.proportions = (self.proportions + delta_props) % 1
+		self.update_planet_points()
+
+	def update_planet_points(self):
+		positions = self.get_positions()
+		self.planets.set_points(
+			(positions[:, np.newaxis, :] + self.planet_template).reshape(-1, 3)
 		)
-class TheMotionOfPlanets(Scene):
+
+	def get_orbit_paths(self, n_samples=64):
+		# All ellipses as straight-edged subpaths of one mobject
+		proportions = np.linspace(0, 1, n_samples + 1)
+		samples = self.get_positions(proportions[:, np.newaxis]).transpose(1, 0, 2)
+		starts = samples[:, :-1]
+		ends = samples[:, 1:]
+		curves = np.stack([
+			interpolate(starts, ends, alpha)
+			for alpha in np.linspace(0, 1, 4)
+		], axis=2)
+		paths = VMobject()
+		paths.set_points(curves.reshape(-1, 3))
+		return paths
+
+class StaticLayerScene(Scene):
+	# For a wait with updaters running, manim redraws every mobject on
+	# every frame. Here the mobjects added before the first one that can
+	# change are drawn once into the background, as play() already does
+	# for animations, and only the rest is drawn per frame
+	cache_static_layers = True
+
+	def compile_animation_data(self, *animations, **play_kwargs):
+		result = Scene.compile_animation_data(self, *animations, **play_kwargs)
+		updating_wait = (
+			len(self.animations) == 1
+			and isinstance(self.animations[0], Wait)
+			and not self.animations[0].is_static_wait
+		)
+		if self.cache_static_layers and updating_wait:
+			(
+				self.moving_mobjects,
+				self.static_mobjects,
+			) = self.get_moving_and_static_mobjects(self.animations)
+		return result
+
+class TheMotionOfPlanets(StaticLayerScene):
 
 	suncenter = ORIGIN+3*RIGHT
 	sun_height = 0.5
@@ -57,6 +290,10 @@ class TheMotionOfPlanets(Scene):
 	comet_height = 0.2
 	ellipse_color = WHITE
 	ellipse_stroke_width = 1
+	wait_time = 30
+	# Solve Kepler's equation instead of stepping the orbit every frame
+	use_kepler_orbit = False
+	orbit_period = 12
 
 	def construct(self):
 		self.setup_orbits()
@@ -68,17 +305,23 @@ class TheMotionOfPlanets(Scene):
 		self.sun = sun
 		comet = self.get_comet()
 		ellipse = self.get_ellipse()
-		orbit = Orbiting(comet, sun, ellipse, rate=5)
+		orbit = self.get_orbit(comet, sun, ellipse)
 
 		self.add(sun)
 		#self.add(comet)
 		self.add(ellipse)
 		#self.add_foreground_mobjects(comet)
 		self.add(orbit)
-		self.wait(30)
+		self.wait(self.wait_time)
 	
-	def get_orbit(self):
-		planet = Dot(color=GRAY)
+	def get_orbit(self, comet, sun, ellipse):
+		if self.use_kepler_orbit:
+			return KeplerOrbiting(
+				comet, self.a, self.b, sun.get_center(),
+				period=self.orbit_period,
+				duration=self.wait_time,
+			)
+		return Orbiting(comet, sun, ellipse, rate=5)
 
 	def get_comet(self):
 		comet = Dot(color=GRAY)
@@ -105,28 +348,85 @@ class TheMotionOfPlanets(Scene):
 		]
 		return ellipse
 
+class TheMotionOfPlanetsKepler(TheMotionOfPlanets):
+
+	use_kepler_orbit = True
+
+class SolarSystem(TheMotionOfPlanets):
+
+	n_bodies = 100
+	orbit_seed = 0
+
+	def construct(self):
+		self.setup_system()
+
+	def setup_system(self):
+		sun = Dot(color=RED)
+		sun.set_height(self.sun_height)
+		sun.move_to(self.suncenter)
+		self.sun = sun
+
+		state = np.random.RandomState(self.orbit_seed)
+		a = state.uniform(1, self.a, self.n_bodies)
+		b = a * state.uniform(0.6, 0.95, self.n_bodies)
+		system = OrbitalSystem(
+			sun, a, b,
+			angles=state.uniform(0, TAU, self.n_bodies),
+			proportions=state.uniform(0, 1, self.n_bodies),
+		)
+		paths = system.get_orbit_paths()
+		paths.set_stroke(self.ellipse_color, 0.5, opacity=0.3)
+
+		self.add(paths, sun, system)
+		self.wait(self.wait_time)
+
 ##################################################################
 
 def get_force_field_func(*point_strength_pairs, **kwargs):
 	radius = kwargs.get("radius", 0.5)
 
-	def func(point):
-		result = np.array(ORIGIN)
-		for center, strength in point_strength_pairs:
-			to_center = center - point
-			norm = LA.norm(to_center)
+	centers = np.array([center for center, strength in point_strength_pairs], dtype=float)
+	strengths = np.array([strength for center, strength in point_strength_pairs], dtype=float)
+	sources = [
+		(tuple(center), strength) for center, strength in zip(centers.tolist(), strengths.tolist())
+	]
+
+	def point_func(point):
+		# ArrowVectorField and StreamLines ask for one point at a time, for
+		# which plain floats beat setting up the (N, K, 3) arrays below
+		x, y, z = point.tolist()
+		result_x = result_y = result_z = 0.0
+		for (center_x, center_y, center_z), strength in sources:
+			dx, dy, dz = center_x - x, center_y - y, center_z - z
+			norm = math.sqrt(dx * dx + dy * dy + dz * dz)
 			if norm == 0:
 				continue
-			elif norm < radius:
-				to_center /= radius**3
-			elif norm >= radius:
-				to_center /= norm**3
-			to_center *= -strength
-			result += to_center
-		return result
+			weight = -strength / max(norm, radius)**3
+			result_x += weight * dx
+			result_y += weight * dy
+			result_z += weight * dz
+		return np.array([result_x, result_y, result_z])
+
+	def func(points):
+		# Accepts a single point (3,) or a batch of points (N, 3)
+		points = np.asarray(points, dtype=float)
+		if points.ndim == 1:
+			return point_func(points)
+
+		# (N, K, 3) vectors from every point to every source
+		to_centers = centers[np.newaxis, :, :] - points[:, np.newaxis, :]
+		norms = LA.norm(to_centers, axis=2)
+		# Softened radius: inside of it the field grows linearly
+		denominators = np.maximum(norms, radius)**3
+		weights = np.where(norms == 0, 0, -strengths / denominators)
+		return np.einsum("nk,nkd->nd", weights, to_centers)
 	return func
 
-class Field(Scene):
+class Field(StaticLayerScene):
+
+	# Seconds played, which the gallery cannot read off the stream lines
+	render_duration = 5
+
 	def construct(self):
 
 		large_mass = Dot(color=GREY_BROWN, radius=0.1).shift(1.5*LEFT)
@@ -153,99 +453,159 @@ class Field(Scene):
 		self.wait(stream_lines.virtual_time / stream_lines.flow_speed)
 		self.wait(3)
 
-class InfiniteSum(Scene):
+class ViewportNumberLine(NumberLine):
+	# A NumberLine that only makes the ticks and numbers landing inside
+	# the frame, once add_visible_ticks_and_numbers is called with the
+	# line in place. Ticks are the subpaths of a single VMobject; numbers
+	# are DecimalNumbers, which share one glyph per digit
+
+	def __init__(self, x_range, numbers_to_include=None, **kwargs):
+		self.label_values = numbers_to_include
+		NumberLine.__init__(
+			self, x_range, include_ticks=False, include_numbers=False, **kwargs
+		)
+
+	def number_to_points(self, numbers):
+		alphas = (np.asarray(numbers, dtype=float) - self.x_min) / (self.x_max - self.x_min)
+		start, end = self.get_start(), self.get_end()
+		return start + alphas[:, np.newaxis] * (end - start)
+
+	def get_visible_numbers(self, numbers, margin=0.5):
+		numbers = np.asarray(numbers, dtype=float)
+		points = self.number_to_points(numbers)
+		in_frame = (
+			(np.abs(points[:, 0]) <= config.frame_x_radius + margin)
+			& (np.abs(points[:, 1]) <= config.frame_y_radius + margin)
+		)
+		return numbers[in_frame]
+
+	def add_visible_ticks_and_numbers(self, margin=0.5):
+		tick_values = self.get_visible_numbers(self.get_tick_range(), margin)
+		sizes = np.where(
+			np.isin(tick_values, self.numbers_with_elongated_ticks),
+			self.tick_size * self.longer_tick_multiple,
+			self.tick_size,
+		)[:, np.newaxis]
+		normal = rotate_vector(UP, self.get_angle())
+		centers = self.number_to_points(tick_values)
+		thirds = np.linspace(0, 1, 4)[:, np.newaxis, np.newaxis]
+		tick_points = interpolate(centers - sizes * normal, centers + sizes * normal, thirds)
+		ticks = VMobject()
+		ticks.set_points(tick_points.transpose(1, 0, 2).reshape(-1, 3))
+		ticks.match_style(self)
+		self.add(ticks)
+		self.ticks = ticks
+
+		if self.label_values is not None:
+			numbers = VGroup(*[
+				self.get_number_mobject(x)
+				for x in self.get_visible_numbers(self.label_values, margin)
+			])
+			self.add(numbers)
+			self.numbers = numbers
+		return self
+
+class InfiniteSum(tex_cache.GlyphCacheScene, Scene):
+
+	first_term = 3
+	ratio = 3
+	n_terms = 3
+	# Parts of the series shorter than this on screen are left out
+	min_segment_length = 0.05
+
 	def construct(self):
 
-		nl = NumberLine(
+		nl = ViewportNumberLine(
 			x_range=[0,65,1.25],
 			length=26,
 			numbers_with_elongated_ticks=[0,5,10,15,20,25,30,35,40,45,50,55,60,65],
-			include_numbers=True,
 			numbers_to_include= [0,5,10,15,20,25,30,35,40,45,50,55,60,65],
 			decimal_number_config={"num_decimal_places": 0},
 			color = BLUE,
 			).shift(2*DOWN)
 		nl.to_edge(LEFT,buff=0)
+		nl.add_visible_ticks_and_numbers()
 
 		LINE_COLOR = [RED_A,RED]
-		COLOR_bool = True
-
-		sum_brace = []
-		sum_line=[]
-		SUM=[]
-		a,b=0,3
-		for i in range(0,3,1):
-			COLOR_bool = int(not(COLOR_bool))
-			sum_brace.append(BraceBetweenPoints(nl.n2p(a),nl.n2p(b),UP))
-			sum_line.append(Line(nl.n2p(a),nl.n2p(b)).set_color(LINE_COLOR[COLOR_bool]))
-			SUM.append(VGroup(sum_brace[i],sum_line[i]))
-			a=a+3**(i+1)
-			b=b+3**(i+2)
-
-		sum_brace_group = Group(*[sum_brace[i] for i in range(3)])
-		sum_line_group= Group(*[sum_line[i] for i in range(3)])
-		
-		sum_tex = Tex("3","9","27")
-
-		sum_tex[0].next_to(sum_brace_group[0],UP)
-		sum_tex[1].next_to(sum_brace_group[1],UP)
-		sum_tex[2].next_to(sum_brace_group[2],UP)
+
+		lengths = self.first_term * float(self.ratio)**np.arange(self.n_terms)
+		ends = np.cumsum(lengths)
+		starts = ends - lengths
+		start_points = nl.number_to_points(starts)
+		end_points = nl.number_to_points(ends)
+		on_screen_lengths = (
+			np.minimum(end_points[:, 0], config.frame_x_radius)
+			- np.maximum(start_points[:, 0], -config.frame_x_radius)
+		)
+		visible = np.flatnonzero(on_screen_lengths > self.min_segment_length)
+		if len(visible) == 0:
+			self.play(Create(nl))
+			return
+
+		sum_brace = [BraceBetweenPoints(start_points[i], end_points[i], UP) for i in visible]
+		sum_line = [
+			Line(start_points[i], end_points[i]).set_color(LINE_COLOR[i % 2])
+			for i in visible
+		]
+		sum_tex = Tex(*[f"{lengths[i]:g}" for i in visible])
+		for tex, brace in zip(sum_tex, sum_brace):
+			tex.next_to(brace, UP)
 
 		self.play(Create(nl))
-		for i in range(0,3):
+		for brace, line, tex in zip(sum_brace, sum_line, sum_tex):
 			self.play(AnimationGroup(
-				GrowFromEdge(sum_brace_group[i], LEFT),
-				GrowFromEdge(sum_line_group[i], LEFT),
-				FadeIn(sum_tex[i]),
+				GrowFromEdge(brace, LEFT),
+				GrowFromEdge(line, LEFT),
+				FadeIn(tex),
 				lag_ratio = 0.5,
 				run_time = 1.5,
 				)
 			)
 
-class StackRect(Scene):
+class SquareGrid(VMobject):
+	# n x n squares of side cell_size, buff apart, as the subpaths of one
+	# VMobject so they share one style
+
+	def __init__(self, n, cell_size=0.3, buff=0.1, **kwargs):
+		self.n = n
+		self.cell_size = cell_size
+		self.buff = buff
+		VMobject.__init__(self, **kwargs)
+
+	def generate_points(self):
+		# Straight edges UR -> UL -> DL -> DR -> UR, same as Rectangle
+		corners = self.cell_size / 2 * np.array([UR, UL, DL, DR, UR])
+		thirds = np.linspace(0, 1, 4)[:, np.newaxis, np.newaxis]
+		square = interpolate(corners[:-1], corners[1:], thirds).transpose(1, 0, 2).reshape(-1, 3)
+
+		offsets = (np.arange(self.n) - (self.n - 1) / 2) * (self.cell_size + self.buff)
+		x, y = np.meshgrid(offsets, -offsets)
+		centers = np.stack([x.ravel(), y.ravel(), np.zeros(self.n**2)], axis=1)
+		self.set_points((centers[:, np.newaxis, :] + square).reshape(-1, 3))
+
+class StackRect(tex_cache.GlyphCacheScene, Scene):
+
+	n_terms = 5
+	cell_size = 0.3
+	cell_buff = 0.1
+
 	def construct(self):
-		sequence = MathTex(r"1",r",",r"4",r",",r"9",r",",r"16",r",",r"?")
-		sequence[0].shift(4*LEFT,1.5*DOWN),
-		sequence[1].shift(3*LEFT,1.5*DOWN),
-		sequence[2].shift(2*LEFT,1.5*DOWN),
-		sequence[3].shift(1*LEFT,1.5*DOWN),
-		sequence[4].shift(1.5*DOWN),
-		sequence[5].shift(1*RIGHT,1.5*DOWN),
-		sequence[6].shift(2*RIGHT,1.5*DOWN),
-		sequence[7].shift(3*RIGHT,1.5*DOWN),
-		sequence[8].shift(4*RIGHT,1.5*DOWN),
-
-		rect = Rectangle(height=0.3, width=0.3, stroke_color = WHITE, stroke_opacity= 1)
-		rect.set_fill(YELLOW, opacity=0.8)
-		rect.set_stroke(width=0)
-
-		rectgroup_1 = rect.copy().next_to(sequence[0],5*UP)
-
-		rgroup_2 = VGroup(*[rect.copy() for i in range(2)])
-		rgroup_2.arrange(RIGHT, buff = 0.1)
-		rectgroup_2 = VGroup(*[rgroup_2.copy() for i in range(2)])
-		rectgroup_2.arrange(DOWN, buff = 0.1)
-		rectgroup_2.next_to(sequence[2],5*UP)
-
-		rgroup_3 = VGroup(*[rect.copy() for i in range(3)])
-		rgroup_3.arrange(RIGHT, buff = 0.1)
-		rectgroup_3 = VGroup(*[rgroup_3.copy() for i in range(3)])
-		rectgroup_3.arrange(DOWN, buff = 0.1)
-		rectgroup_3.next_to(sequence[4],5*UP)
-
-		rgroup_4 = VGroup(*[rect.copy() for i in range(4)])
-		rgroup_4.arrange(RIGHT, buff = 0.1)
-		rectgroup_4 = VGroup(*[rgroup_4.copy() for i in range(4)])
-		rectgroup_4.arrange(DOWN, buff = 0.1)
-		rectgroup_4.next_to(sequence[6],5*UP)
-		
-		rgroup_5 = VGroup(*[rect.copy() for i in range(5)])
-		rgroup_5.arrange(RIGHT, buff = 0.1)
-		rectgroup_5 = VGroup(*[rgroup_5.copy() for i in range(5)])
-		rectgroup_5.arrange(DOWN, buff = 0.1)
-		rectgroup_5.next_to(sequence[8],5*UP)
-
-		self.add(rectgroup_1,rectgroup_2,rectgroup_3,rectgroup_4,rectgroup_5,sequence)
+		# 1, 4, 9, ... with the last term left as a question
+		terms = []
+		for n in range(1, self.n_terms):
+			terms += [str(n**2), ","]
+		sequence = MathTex(*terms, "?")
+		for i, term in enumerate(sequence):
+			term.shift((i - (len(sequence) - 1) / 2) * RIGHT, 1.5 * DOWN)
+
+		grids = VGroup(*[
+			SquareGrid(n, self.cell_size, self.cell_buff).next_to(sequence[2 * (n - 1)], 5 * UP)
+			for n in range(1, self.n_terms + 1)
+		])
+		grids.set_fill(YELLOW, opacity=0.8)
+		grids.set_stroke(width=0)
+
+		self.add(grids, sequence)
 
 class SphereScene(ThreeDScene):
 
@@ -299,10 +659,12 @@ class Ring(SphereScene):
 		self.add(sphere)
 		self.sphere = sphere
 
-		u_values, v_values = sphere.get_u_values_and_v_values()
-		rings = VGroup(*[VGroup() for u in u_values])
-		for piece in sphere:
-			rings[piece.u_index].add(piece.copy())
+		# A surface per band of latitude, styled as the sphere, instead of
+		# a copy of each of its faces
+		rings = get_band_rings(
+			sphere.func, [sphere.u_min, sphere.u_max], [sphere.v_min, sphere.v_max],
+			sphere.resolution, stroke_color=WHITE, stroke_width=0.25,
+		)
 		self.set_ring_colors(rings)
 		self.rings = rings
 
@@ -331,3 +693,435 @@ class Ring(SphereScene):
 		for i in range(0, a):
 			rings[i].set_color(colors[i])
 
+
+##################################################################
+
+def get_pair_operators(masses, G):
+	# Every unordered pair of bodies (i, j), i < j, appears once.
+	# to_pairs @ positions gives x_j - x_i for each pair, and
+	# from_pairs @ pull spreads each pair's pull back onto both bodies.
+	n_bodies = len(masses)
+	firsts, seconds = np.triu_indices(n_bodies, 1)
+	pairs = np.arange(len(firsts))
+	to_pairs = np.zeros((len(pairs), n_bodies))
+	to_pairs[pairs, seconds] = 1
+	to_pairs[pairs, firsts] = -1
+	from_pairs = np.zeros((n_bodies, len(pairs)))
+	from_pairs[firsts, pairs] = G * masses[seconds]
+	from_pairs[seconds, pairs] = -G * masses[firsts]
+	return to_pairs, from_pairs
+
+def get_gravitational_accelerations(positions, to_pairs, from_pairs):
+	diffs = to_pairs @ positions
+	weights = np.add.reduce(diffs * diffs, 1)**-1.5
+	return (from_pairs * weights) @ diffs
+
+# Up to this many bodies, substeps run on plain floats: for so few the
+# cost of a NumPy call is well above that of the arithmetic it does
+MAX_SCALAR_BODIES = 4
+
+def leapfrog(positions, velocities, masses, G, dt, n_steps):
+	# Kick-drift-kick leapfrog, with the inner half kicks merged
+	step = dt / n_steps
+	to_pairs, from_pairs = get_pair_operators(masses, G)
+	positions = np.array(positions, dtype=float)
+
+	# Carry step * velocity, so a drift is one add and a kick is
+	# one acceleration evaluation with step**2 folded into the operator
+	accelerations = get_gravitational_accelerations(positions, to_pairs, from_pairs)
+	drifts = step * (velocities + 0.5 * step * accelerations)
+	if len(masses) <= MAX_SCALAR_BODIES:
+		positions, drifts = scalar_leapfrog_steps(positions, drifts, masses, G * step**2, n_steps)
+	else:
+		kick_operator = step**2 * from_pairs
+		for x in range(n_steps):
+			positions += drifts
+			drifts += get_gravitational_accelerations(positions, to_pairs, kick_operator)
+
+	accelerations = get_gravitational_accelerations(positions, to_pairs, from_pairs)
+	velocities = drifts / step - 0.5 * step * accelerations
+	return positions, velocities
+
+def scalar_leapfrog_steps(positions, drifts, masses, kick_scale, n_steps):
+	# The drift and kick loop of leapfrog, on one [x, y, z] list per body
+	# that every pair it is part of updates in place
+	points = positions.tolist()
+	steps = drifts.tolist()
+	bodies = list(zip(points, steps))
+	firsts, seconds = np.triu_indices(len(masses), 1)
+	pairs = [
+		(points[i], points[j], steps[i], steps[j], kick_scale * masses[j], kick_scale * masses[i])
+		for i, j in zip(firsts, seconds)
+	]
+	for x in range(n_steps):
+		for point, step in bodies:
+			point[0] += step[0]
+			point[1] += step[1]
+			point[2] += step[2]
+		for point1, point2, step1, step2, pull1, pull2 in pairs:
+			dx = point2[0] - point1[0]
+			dy = point2[1] - point1[1]
+			dz = point2[2] - point1[2]
+			weight = (dx * dx + dy * dy + dz * dz) ** -1.5
+			a1 = pull1 * weight
+			a2 = pull2 * weight
+			step1[0] += a1 * dx
+			step1[1] += a1 * dy
+			step1[2] += a1 * dz
+			step2[0] -= a2 * dx
+			step2[1] -= a2 * dy
+			step2[2] -= a2 * dz
+	return np.array(points), np.array(steps)
+
+class Trail(VGroup):
+
+	def __init__(self, start_point, capacity=1000, min_distance=0.01,
+		n_fade_segments=1, color=WHITE, width=1, opacity=0.75, **kwargs):
+		VGroup.__init__(self, **kwargs)
+		self.capacity = capacity
+		self.min_distance = min_distance
+		# Preallocated buffer of cubic curves, twice the capacity, of which
+		# curves[start:end] are drawn. Curves are written at end, and once
+		# it reaches the end of the buffer the last capacity curves are
+		# moved back to the front, which is a copy every capacity appends
+		self.curves = np.zeros((2 * capacity, 4, 3))
+		self.start = 0
+		self.end = 0
+		self.last_point = np.array(start_point, dtype=float)
+
+		# The tail is split into pieces of increasing opacity
+		opacities = np.linspace(0, opacity, n_fade_segments + 1)[1:]
+		for piece_opacity in opacities:
+			piece = VMobject()
+			piece.set_stroke(color, width, opacity=piece_opacity)
+			self.add(piece)
+
+	def add_point(self, point):
+		point = np.array(point, dtype=float)
+		start = self.last_point
+		if LA.norm(point - start) <= self.min_distance:
+			return self
+
+		if self.end == len(self.curves):
+			n_curves = self.end - self.start
+			self.curves[:n_curves] = self.curves[self.start:self.end]
+			self.start, self.end = 0, n_curves
+
+		chord = point - start
+		if self.end > self.start:
+			# Catmull-Rom tangent at the shared anchor; only the previous
+			# curve's last handle and the new curve need to change
+			previous = self.curves[self.end - 1]
+			tangent = 0.5 * (point - previous[0])
+			previous[2] = start - tangent / 3
+		else:
+			tangent = chord
+		self.curves[self.end] = [
+			start, start + tangent / 3, point - chord / 3, point,
+		]
+		self.end += 1
+		self.start = max(self.start, self.end - self.capacity)
+		self.last_point = point
+
+		self.refresh_points()
+		return self
+
+	def refresh_points(self):
+		# The pieces' points are views into the buffer, not copies, so
+		# nothing but the new curve is written per point added
+		points = self.curves[self.start:self.end].reshape(-1, 3)
+		bounds = 4 * np.linspace(0, self.end - self.start, len(self.submobjects) + 1).astype(int)
+		for piece, first, last in zip(self.submobjects, bounds[:-1], bounds[1:]):
+			piece.points = points[first:last]
+		return self
+
+class SimulateThreeBody(ThreeDScene):
+
+	masses = [1, 6, 3]
+	colors = [RED_E, GREEN_E, BLUE_E]
+	G = 1
+	play_time = 60
+	num_mid_steps = 1000
+	# Same start on every render, so the trajectory cache is reused;
+	# None draws a new one each time
+	initial_seed = 0
+	# Integrate play_time once up front and play it back from disk
+	use_trajectory_cache = True
+	trail_capacity = 1000
+	trail_fade_segments = 1
+	# Seconds of scene time per partial movie file; with resumable set
+	# the state is saved between them and an interrupted render picks
+	# up after the last chunk it finished
+	chunk_time = 5
+	resumable = True
+
+	def construct(self):
+		self.add_axes()
+		self.add_bodies()
+		if self.use_trajectory_cache:
+			self.precompute_trajectory()
+		self.add_trajectories()
+		self.let_play()
+
+	def add_bodies(self):
+		masses = np.array(self.masses, dtype=float)
+		colors = self.colors
+
+		bodies = self.bodies = VGroup()
+
+		centers = self.load_initial_position()
+
+		velocities = np.array([
+			self.get_initial_velocity(center, centers, mass)
+			for mass, center in zip(masses, centers)
+		])
+
+		# Work in the centre of mass frame
+		total_mass = np.sum(masses)
+		centers -= np.dot(masses, centers) / total_mass
+		velocities -= np.dot(masses, velocities) / total_mass
+
+		# The whole system lives in these arrays, bodies only display it
+		self.body_masses = masses
+		self.positions = centers
+		self.velocities = velocities
+
+		for mass, color, center in zip(masses, colors, centers):
+			body = Sphere(
+				stroke_width=0.1,
+			)
+			body.set_color(color)
+			body.set_opacity(0.75)
+			body.mass = mass
+			body.radius = 0.08 * np.sqrt(mass)
+			body.set_width(2 * body.radius)
+
+			body.point = center
+			body.move_to(center)
+
+			bodies.add(body)
+
+	def get_initial_position(self):
+		state = random.RandomState(self.initial_seed)
+		return [
+			np.array([state.randint(3),state.randint(3),state.randint(3)])
+			for x in range(len(self.masses))
+		]
+
+	def load_initial_position(self):
+		# Without a seed, a resumed render has to be given back the
+		# random start the interrupted one drew
+		if self.initial_seed is not None or not self.is_resumable():
+			return np.array(self.get_initial_position(), dtype=float)
+		path = os.path.join(self.get_run_dir(), "initial_position.npy")
+		if not os.path.exists(path):
+			np.save(path, np.array(self.get_initial_position(), dtype=float))
+		return np.load(path)
+
+	def get_initial_velocity(self, center, centers, mass):
+		to_others = [
+			center - center2
+			for center2 in centers
+		]
+		velocity = 0.2 * mass * normalize(*filter(
+			lambda diff: LA.norm(diff) > 0,
+			to_others
+		))
+		return velocity
+
+	def add_trajectories(self):
+		self.trails = []
+		for body in self.bodies:
+			traj = Trail(
+				body.point,
+				capacity=self.trail_capacity,
+				n_fade_segments=self.trail_fade_segments,
+				color=body.color, width=1, opacity=0.75,
+			)
+			traj.body = body
+			traj.add_updater(lambda t: t.add_point(t.body.point))
+			self.trails.append(traj)
+			self.add(traj, body)
+
+	def let_play(self):
+		bodies = self.bodies
+		bodies.add_updater(self.update_bodies)
+		# Break it up to see partial files as
+		# it's rendered
+		self.add(bodies)
+		self.first_chunk_play = self.renderer.num_plays
+		n_chunks = int(np.ceil(self.play_time / self.chunk_time))
+		first_chunk = self.resume_from_checkpoint() if self.is_resumable() else 0
+		for chunk in range(first_chunk, n_chunks):
+			if self.is_resumable() and chunk > 0:
+				self.save_checkpoint(chunk)
+			self.wait(min(self.chunk_time, self.play_time - chunk * self.chunk_time))
+		if self.is_resumable():
+			shutil.rmtree(self.get_run_dir())
+
+	def is_resumable(self):
+		# Checkpoints are only worth keeping alongside partial movie files
+		return self.resumable and hasattr(self.renderer.file_writer, "partial_movie_directory")
+
+	def get_run_dir(self):
+		# Keyed on everything the saved states and partial movie files
+		# depend on: the code of the scene, its subclasses' settings, the
+		# trail and integrator it draws with, and the render quality
+		if getattr(self, "run_dir", None) is None:
+			scene_classes = [
+				cls for cls in self.__class__.__mro__ if issubclass(cls, SimulateThreeBody)
+			]
+			key_data = [
+				*[inspect.getsource(obj) for obj in [*scene_classes, Trail, leapfrog, scalar_leapfrog_steps]],
+				config["frame_rate"], config["pixel_width"], config["pixel_height"],
+			]
+			self.run_dir = os.path.join(
+				config.get_dir("media_dir"), "simulations",
+				f"{self.__class__.__name__}_{hashlib.sha1(repr(key_data).encode()).hexdigest()}",
+			)
+		os.makedirs(self.run_dir, exist_ok=True)
+		return self.run_dir
+
+	def get_checkpoint_path(self, chunk):
+		return os.path.join(self.get_run_dir(), f"chunk_{chunk:04}.npz")
+
+	def save_checkpoint(self, chunk):
+		# The state at the start of chunk, with the partial movie files
+		# of the chunks before it
+		camera = self.renderer.camera
+		path = self.get_checkpoint_path(chunk)
+		with open(path + ".part", "wb") as file:
+			np.savez(
+				file,
+				positions=self.positions,
+				velocities=self.velocities,
+				trajectory_time=getattr(self, "trajectory_time", 0),
+				time=self.renderer.time,
+				camera=[tracker.get_value() for tracker in camera.get_value_trackers()],
+				trail_curves=[trail.curves for trail in self.trails],
+				trail_starts=[trail.start for trail in self.trails],
+				trail_ends=[trail.end for trail in self.trails],
+				trail_last_points=[trail.last_point for trail in self.trails],
+				hashes=np.array(self.renderer.animations_hashes[self.first_chunk_play:], dtype=str),
+			)
+		os.replace(path + ".part", path)
+
+	def resume_from_checkpoint(self):
+		file_writer = self.renderer.file_writer
+		chunk = int(np.ceil(self.play_time / self.chunk_time))
+		while chunk > 0:
+			path = self.get_checkpoint_path(chunk)
+			if os.path.exists(path):
+				checkpoint = np.load(path)
+				hashes = list(checkpoint["hashes"])
+				if len(hashes) == chunk and all(
+					os.path.exists(os.path.join(
+						file_writer.partial_movie_directory,
+						f"{animation_hash}{config['movie_file_extension']}",
+					))
+					for animation_hash in hashes
+				):
+					break
+			chunk -= 1
+		if chunk == 0:
+			return 0
+
+		# The chunks already rendered stand in for the waits that made them
+		for animation_hash in hashes:
+			file_writer.add_partial_movie_file(animation_hash)
+			self.renderer.animations_hashes.append(animation_hash)
+			self.renderer.num_plays += 1
+
+		self.positions = checkpoint["positions"]
+		self.velocities = checkpoint["velocities"]
+		self.trajectory_time = float(checkpoint["trajectory_time"])
+		self.renderer.time = float(checkpoint["time"])
+		for tracker, value in zip(self.renderer.camera.get_value_trackers(), checkpoint["camera"]):
+			tracker.set_value(value)
+		for body, point in zip(self.bodies, self.positions):
+			body.point = point
+			body.move_to(point)
+		for i, trail in enumerate(self.trails):
+			trail.curves = np.array(checkpoint["trail_curves"][i])
+			trail.start = int(checkpoint["trail_starts"][i])
+			trail.end = int(checkpoint["trail_ends"][i])
+			trail.last_point = np.array(checkpoint["trail_last_points"][i])
+			trail.refresh_points()
+		return chunk
+
+	def get_trajectory_cache_key(self):
+		# Everything the integrated motion depends on
+		key_data = np.concatenate([
+			self.body_masses,
+			[self.G, config["frame_rate"], self.num_mid_steps, self.play_time],
+			self.positions.ravel(),
+			self.velocities.ravel(),
+		])
+		return hashlib.sha1(key_data.tobytes()).hexdigest()
+
+	def get_trajectory_cache_path(self):
+		cache_dir = os.path.join(config.get_dir("media_dir"), "simulations")
+		os.makedirs(cache_dir, exist_ok=True)
+		return os.path.join(
+			cache_dir,
+			f"{self.__class__.__name__}_{self.get_trajectory_cache_key()}.npy",
+		)
+
+	def precompute_trajectory(self):
+		path = self.get_trajectory_cache_path()
+		if not os.path.exists(path):
+			frame_rate = config["frame_rate"]
+			n_frames = int(np.ceil(self.play_time * frame_rate)) + 1
+			# Written frame by frame straight to disk, so a long run
+			# never has to fit in memory
+			partial_path = f"{path}.{os.getpid()}.part"
+			trajectory = np.lib.format.open_memmap(
+				partial_path, mode="w+", dtype=float,
+				shape=(n_frames, *self.positions.shape),
+			)
+			positions, velocities = self.positions, self.velocities
+			trajectory[0] = positions
+			for frame in range(1, n_frames):
+				positions, velocities = leapfrog(
+					positions, velocities,
+					self.body_masses, self.G,
+					1 / frame_rate, self.num_mid_steps,
+				)
+				trajectory[frame] = positions
+			trajectory.flush()
+			del trajectory
+			os.replace(partial_path, path)
+
+		self.trajectory = np.load(path, mmap_mode="r")
+		self.trajectory_time = 0
+
+	def update_bodies(self, bodies, dt):
+		if dt == 0:
+			return bodies
+		if self.use_trajectory_cache:
+			self.trajectory_time += dt
+			frame = int(round(self.trajectory_time * config["frame_rate"]))
+			frame = min(frame, len(self.trajectory) - 1)
+			self.positions = np.array(self.trajectory[frame])
+		else:
+			self.positions, self.velocities = leapfrog(
+				self.positions, self.velocities,
+				self.body_masses, self.G,
+				dt, self.num_mid_steps,
+			)
+		for body, point in zip(bodies, self.positions):
+			body.point = point
+			body.move_to(point)
+		return bodies
+
+	def add_axes(self):
+		axes = ThreeDAxes()
+		axes.set_stroke(width=0.5)
+		self.add(axes)
+
+		# Orient
+		self.set_camera_orientation(
+				phi=70 * DEGREES,
+				theta=-110 * DEGREES,
+		)
+		self.begin_ambient_camera_rotation()
@@ -0,0 +1,270 @@
+import ast
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+# Finds the scenes of the gallery modules without importing manim, and
+# guesses how long each takes to render from what their source says
+
+MAIN_DIR = os.path.dirname(os.path.abspath(__file__))
+SCENE_FILES = [
+	os.path.join(MAIN_DIR, "code_snipped.py"),
+	os.path.join(MAIN_DIR, "sphere.py"),
+]
+SCENE_BASES = ["Scene", "ThreeDScene", "MovingCameraScene", "ZoomedScene"]
+# Rough render cost of a surface face relative to a second of animation
+FACES_PER_SECOND = 500
+# Class attributes giving how long a scene plays, for the waits whose
+# length the source does not settle
+DURATION_ATTRIBUTES = ["play_time", "wait_time"]
+MEDIA_DIR = os.path.join(os.path.dirname(MAIN_DIR), "Media")
+# Scenes shown in the README and the format of their file in MEDIA_DIR
+MEDIA_FORMATS = {
+	("code_snipped.py", "TheMotionOfPlanets"): "gif",
+	("code_snipped.py", "InfiniteSum"): "gif",
+	("code_snipped.py", "StackRect"): "png",
+	("code_snipped.py", "Ring"): "gif",
+	("code_snipped.py", "SimulateThreeBody"): "gif",
+	("sphere.py", "RotateAllPiecesWithExpansion"): "gif",
+}
+RANDOM_MODULES = ["random", "np.random", "numpy.random"]
+# Random calls that make the following ones repeatable when given a seed
+SEEDING_CALLS = ["seed", "RandomState", "default_rng"]
+
+SceneInfo = namedtuple(
+	"SceneInfo",
+	["file_name", "name", "duration", "n_faces", "cost", "source_hash", "random_calls"],
+)
+
+def get_defined_names(node):
+	if isinstance(node, (ast.ClassDef, ast.FunctionDef)):
+		return {node.name}
+	if isinstance(node, ast.Assign):
+		return {target.id for target in node.targets if isinstance(target, ast.Name)}
+	return set()
+
+class SceneModule:
+
+	def __init__(self, file_name):
+		self.file_name = file_name
+		with open(file_name) as file:
+			self.source = file.read()
+		self.tree = ast.parse(self.source, file_name)
+		# Later definitions win, as they do when the module is run
+		self.classes = {
+			node.name: node for node in self.tree.body
+			if isinstance(node, ast.ClassDef)
+		}
+		self.definitions = {
+			defined_name: node for node in self.tree.body
+			for defined_name in get_defined_names(node)
+		}
+
+	def get_bases(self, name):
+		return [
+			base.id for base in self.classes[name].bases
+			if isinstance(base, ast.Name)
+		]
+
+	def get_mro(self, name):
+		# Classes of this module that name inherits from, closest first
+		mro = [name]
+		for base in self.get_bases(name):
+			if base in self.classes and base not in mro:
+				mro += [c for c in self.get_mro(base) if c not in mro]
+		return mro
+
+	def is_scene(self, name):
+		return any(
+			base in SCENE_BASES or (base in self.classes and self.is_scene(base))
+			for base in self.get_bases(name)
+		)
+
+	def get_attributes(self, name):
+		attributes = {}
+		for class_name in reversed(self.get_mro(name)):
+			for node in self.classes[class_name].body:
+				if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant):
+					for target in node.targets:
+						if isinstance(target, ast.Name):
+							attributes[target.id] = node.value.value
+		return attributes
+
+	def get_methods(self, name):
+		methods = {}
+		for class_name in reversed(self.get_mro(name)):
+			for node in self.classes[class_name].body:
+				if isinstance(node, ast.FunctionDef):
+					methods[node.name] = node
+		return methods
+
+	def get_config(self, name):
+		# Class level settings, as written in the source
+		config = {}
+		for class_name in reversed(self.get_mro(name)):
+			for node in self.classes[class_name].body:
+				if isinstance(node, ast.Assign):
+					for target in node.targets:
+						if isinstance(target, ast.Name):
+							config[target.id] = ast.unparse(node.value)
+		return config
+
+	def get_dependencies(self, name):
+		# Module level definitions the scene's code reaches, in module order
+		needed = set(self.get_mro(name))
+		queue = list(needed)
+		while queue:
+			node = self.definitions[queue.pop()]
+			for used in ast.walk(node):
+				if (
+					isinstance(used, ast.Name)
+					and used.id in self.definitions and used.id not in needed
+				):
+					needed.add(used.id)
+					queue.append(used.id)
+		return [node for node in self.tree.body if get_defined_names(node) & needed]
+
+	def get_local_imports(self):
+		# Files of the modules next to this one that it imports
+		file_names = []
+		for node in self.tree.body:
+			if isinstance(node, ast.Import):
+				module_names = [alias.name for alias in node.names]
+			elif isinstance(node, ast.ImportFrom) and node.level == 0:
+				module_names = [node.module]
+			else:
+				continue
+			for module_name in module_names:
+				file_name = os.path.join(os.path.dirname(self.file_name), f"{module_name}.py")
+				if os.path.exists(file_name):
+					file_names.append(file_name)
+		return file_names
+
+	def get_source_hash(self, name):
+		digest = hashlib.sha256()
+		for file_name in self.get_local_imports():
+			with open(file_name, "rb") as file:
+				digest.update(file.read())
+		for node in self.get_dependencies(name):
+			digest.update(ast.get_source_segment(self.source, node).encode())
+		digest.update(json.dumps(self.get_config(name), sort_keys=True).encode())
+		return digest.hexdigest()
+
+	def get_random_calls(self, name):
+		# Calls drawing from an unseeded generator, which make the scene
+		# come out differently on every render
+		calls = []
+		seeded = False
+		for node in self.get_dependencies(name):
+			for call in ast.walk(node):
+				if not (
+					isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute)
+					and ast.unparse(call.func.value) in RANDOM_MODULES
+				):
+					continue
+				has_seed = bool(call.args or call.keywords)
+				if call.func.attr == "seed" and has_seed:
+					seeded = True
+				elif call.func.attr not in SEEDING_CALLS or not has_seed:
+					calls.append(f"line {call.lineno}: {ast.unparse(call.func)}")
+		return () if seeded else tuple(calls)
+
+	def get_scene_names(self):
+		return [
+			name for name in self.classes
+			if self.is_scene(name) and "construct" in self.get_methods(name)
+		]
+
+	def get_duration(self, name):
+		# Seconds of animation reached from setup and construct, counting
+		# a play or move_camera without run_time as one second. A length
+		# the source does not settle counts as the longest of the scene's
+		# DURATION_ATTRIBUTES, and a render_duration class attribute
+		# replaces the whole estimate
+		attributes = self.get_attributes(name)
+		methods = self.get_methods(name)
+		if isinstance(attributes.get("render_duration"), (int, float)):
+			return attributes["render_duration"]
+		unknown_duration = max([
+			attributes[attribute] for attribute in DURATION_ATTRIBUTES
+			if isinstance(attributes.get(attribute), (int, float))
+		], default=1)
+
+		def get_number(node, default):
+			if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+				return node.value
+			if (
+				isinstance(node, ast.Attribute)
+				and isinstance(node.value, ast.Name) and node.value.id == "self"
+				and isinstance(attributes.get(node.attr), (int, float))
+			):
+				return attributes[node.attr]
+			return default
+
+		def get_repeats(node):
+			if isinstance(node.iter, (ast.List, ast.Tuple)):
+				return len(node.iter.elts)
+			if isinstance(node.iter, ast.Call) and getattr(node.iter.func, "id", None) == "range":
+				args = [get_number(arg, None) for arg in node.iter.args]
+				if None not in args:
+					return len(range(*[int(arg) for arg in args]))
+			return 1
+
+		def get_call_duration(call, visited):
+			func = call.func
+			if not (
+				isinstance(func, ast.Attribute)
+				and isinstance(func.value, ast.Name) and func.value.id == "self"
+			):
+				return 0
+			if func.attr == "wait":
+				return get_number(call.args[0], unknown_duration) if call.args else 1
+			if func.attr in ["play", "move_camera"]:
+				for keyword in call.keywords:
+					if keyword.arg == "run_time":
+						return get_number(keyword.value, unknown_duration)
+				return 1
+			if func.attr in methods and func.attr not in visited:
+				return get_body_duration(methods[func.attr].body, visited | {func.attr})
+			return 0
+
+		def get_body_duration(body, visited):
+			duration = 0
+			for statement in body:
+				if isinstance(statement, ast.For):
+					duration += get_repeats(statement) * get_body_duration(statement.body, visited)
+					continue
+				for node in ast.walk(statement):
+					if isinstance(node, ast.Call):
+						duration += get_call_duration(node, visited)
+			return duration
+
+		return sum(
+			get_body_duration(methods[method].body, {method})
+			for method in ["setup", "construct"] if method in methods
+		)
+
+	def get_n_faces(self, name):
+		# Sphere scenes give their mesh resolution as integer a and b
+		attributes = self.get_attributes(name)
+		a, b = attributes.get("a"), attributes.get("b")
+		if isinstance(a, int) and isinstance(b, int):
+			return a * b
+		return 0
+
+	def get_scene_info(self, name):
+		duration = self.get_duration(name)
+		n_faces = self.get_n_faces(name)
+		cost = (1 + duration) * (1 + n_faces / FACES_PER_SECOND)
+		return SceneInfo(
+			self.file_name, name, duration, n_faces, cost,
+			self.get_source_hash(name), self.get_random_calls(name),
+		)
+
+def find_scenes(file_names=SCENE_FILES):
+	scenes = []
+	for file_name in file_names:
+		module = SceneModule(file_name)
+		scenes += [module.get_scene_info(name) for name in module.get_scene_names()]
+	return scenes
@@ -0,0 +1,189 @@
+import argparse
+import functools
+import inspect
+import json
+import os
+import sys
+import time
+
+from manim import Mobject, config, tempconfig
+
+import benchmark
+import gallery
+
+# Opt-in timing of a gallery scene: every method the gallery defines on
+# the scene, every updater, each mobject's update and the renderer are
+# wrapped while the scene renders, and their times are kept per call
+# stack. Scenes rendered by manim itself are never touched
+
+class Profiler:
+
+	def __init__(self):
+		self.stack = []
+		self.child_times = [0.0]
+		# call stack -> [calls, total time, time outside wrapped callees]
+		self.stats = {}
+
+	def call(self, name, func, *args, **kwargs):
+		self.stack.append(name)
+		self.child_times.append(0.0)
+		start = time.perf_counter()
+		try:
+			return func(*args, **kwargs)
+		finally:
+			elapsed = time.perf_counter() - start
+			child_time = self.child_times.pop()
+			key = tuple(self.stack)
+			self.stack.pop()
+			self.child_times[-1] += elapsed
+			stats = self.stats.setdefault(key, [0, 0.0, 0.0])
+			stats[0] += 1
+			stats[1] += elapsed
+			stats[2] += elapsed - child_time
+
+	def wrap(self, name, func):
+		# functools.wraps keeps the signature manim inspects for dt
+		@functools.wraps(func)
+		def wrapper(*args, **kwargs):
+			return self.call(name, func, *args, **kwargs)
+		return wrapper
+
+	def install(self, scene):
+		wrapped = set()
+		for cls in type(scene).__mro__:
+			if cls is object or cls.__module__.split(".")[0] == "manim":
+				continue
+			for name, value in vars(cls).items():
+				if inspect.isfunction(value) and not name.startswith("__") and name not in wrapped:
+					setattr(scene, name, self.wrap(name, getattr(scene, name)))
+					wrapped.add(name)
+
+		def update_mobjects(dt):
+			for mobject in scene.mobjects:
+				self.call(f"update:{type(mobject).__name__}", mobject.update, dt)
+
+		scene.update_mobjects = update_mobjects
+		scene.update_to_time = self.wrap("update_to_time", scene.update_to_time)
+		scene.renderer.render = self.wrap("render", scene.renderer.render)
+
+	def profile_updaters(self):
+		# Wraps updaters as they are added, for as long as the returned
+		# function has not been called
+		add_updater = Mobject.add_updater
+		remove_updater = Mobject.remove_updater
+
+		def profiled_add_updater(mobject, update_function, *args, **kwargs):
+			name = f"updater:{get_function_name(update_function)}"
+			return add_updater(mobject, self.wrap(name, update_function), *args, **kwargs)
+
+		def profiled_remove_updater(mobject, update_function):
+			for updater in list(mobject.updaters):
+				if getattr(updater, "__wrapped__", updater) is update_function:
+					remove_updater(mobject, updater)
+			return mobject
+
+		def restore():
+			Mobject.add_updater = add_updater
+			Mobject.remove_updater = remove_updater
+
+		Mobject.add_updater = profiled_add_updater
+		Mobject.remove_updater = profiled_remove_updater
+		return restore
+
+	def get_n_frames(self):
+		return sum(stats[0] for key, stats in self.stats.items() if key[-1] == "render")
+
+	def get_report(self, scene_name):
+		n_frames = self.get_n_frames()
+		sections = [
+			{
+				"stack": list(key),
+				"calls": calls,
+				"total_time": total_time,
+				"self_time": self_time,
+				"time_per_frame": total_time / n_frames if n_frames else None,
+			}
+			for key, (calls, total_time, self_time) in self.stats.items()
+		]
+		sections.sort(key=lambda section: section["total_time"], reverse=True)
+		return {"scene": scene_name, "n_frames": n_frames, "sections": sections}
+
+	def write_report(self, path, scene_name):
+		with open(path, "w") as file:
+			json.dump(self.get_report(scene_name), file, indent=4)
+
+	def write_collapsed_stacks(self, path):
+		# One "a;b;c microseconds" line per stack, as flamegraph tools read
+		with open(path, "w") as file:
+			for key, (calls, total_time, self_time) in sorted(self.stats.items()):
+				file.write(f"{';'.join(key)} {int(1e6 * self_time)}\n")
+
+def get_function_name(func):
+	name = getattr(func, "__qualname__", None) or repr(func)
+	code = getattr(func, "__code__", None)
+	if code is not None and "<lambda>" in name:
+		name += f":{code.co_firstlineno}"
+	return name
+
+def profile_scene(scene, quality, write_files=False):
+	scene_class = benchmark.load_scene_class(scene)
+	profiler = Profiler()
+	options = {"quality": benchmark.QUALITIES[quality], "verbosity": "WARNING"}
+	if not write_files:
+		options.update({"dry_run": True, "disable_caching": True})
+	with tempconfig(options):
+		instance = scene_class()
+		profiler.install(instance)
+		restore = profiler.profile_updaters()
+		try:
+			instance.render()
+		finally:
+			restore()
+	return profiler
+
+def get_parser():
+	parser = argparse.ArgumentParser(
+		description="Time the construct steps, updaters and rendering of a gallery scene"
+	)
+	parser.add_argument("scene", help="name of the scene to profile")
+	parser.add_argument("--file", help="module holding the scene, when several define it")
+	parser.add_argument("-q", "--quality", default="l", choices=list(benchmark.QUALITIES))
+	parser.add_argument("--write", action="store_true", help="also write the video, as a normal render would")
+	parser.add_argument("-o", "--output-dir", default=None, help="defaults to <media_dir>/profiles")
+	parser.add_argument("-n", "--top", type=int, default=20, help="number of sections to print")
+	return parser
+
+def main():
+	args = get_parser().parse_args()
+	scenes = [
+		scene for scene in gallery.find_scenes()
+		if scene.name == args.scene
+		and (args.file is None or os.path.basename(scene.file_name) == os.path.basename(args.file))
+	]
+	if len(scenes) != 1:
+		print(f"Found {len(scenes)} scenes named {args.scene}, pick one with --file")
+		return 1
+	scene = scenes[0]
+
+	profiler = profile_scene(scene, args.quality, args.write)
+	output_dir = args.output_dir or os.path.join(config.get_dir("media_dir"), "profiles")
+	os.makedirs(output_dir, exist_ok=True)
+	report_path = os.path.join(output_dir, f"{scene.name}.json")
+	stacks_path = os.path.join(output_dir, f"{scene.name}.folded")
+	profiler.write_report(report_path, scene.name)
+	profiler.write_collapsed_stacks(stacks_path)
+
+	report = profiler.get_report(scene.name)
+	print(f"{scene.name}: {report['n_frames']} frames")
+	for section in report["sections"][:args.top]:
+		per_frame = section["time_per_frame"]
+		per_frame = f"{1000 * per_frame:8.2f}ms/frame" if per_frame is not None else ""
+		print(
+			f"{section['total_time']:8.2f}s  {section['calls']:7} calls  {per_frame}  "
+			f"{' > '.join(section['stack'])}"
+		)
+	print(f"Wrote {report_path} and {stacks_path}")
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main())
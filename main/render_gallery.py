@@ -0,0 +1,161 @@
+import argparse
+import hashlib
+import importlib.metadata
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import gallery
+
+# Renders every scene of the gallery, one manim process per scene,
+# starting with the ones expected to take longest so the slowest scene
+# is not left running alone at the end. Scenes whose source, settings
+# and render options are unchanged since their last render are skipped
+
+DEFAULT_MANIFEST = os.path.join(gallery.MAIN_DIR, "render_manifest.json")
+# Directory manim names after each quality flag
+QUALITY_DIRS = {"l": "480p15", "m": "720p30", "h": "1080p60", "p": "1440p60", "k": "2160p60"}
+
+def get_manim_version():
+	try:
+		return importlib.metadata.version("manim")
+	except importlib.metadata.PackageNotFoundError:
+		return None
+
+def get_manifest_key(scene, quality):
+	return f"{os.path.basename(scene.file_name)}:{scene.name}:{quality}"
+
+def get_render_hash(scene, quality, manim_args):
+	render_data = [scene.source_hash, quality, manim_args, get_manim_version()]
+	return hashlib.sha256(json.dumps(render_data).encode()).hexdigest()
+
+def get_media_format(scene):
+	return gallery.MEDIA_FORMATS.get((os.path.basename(scene.file_name), scene.name))
+
+def get_output_format(manim_args):
+	# The format a render with these options is written in
+	if "-s" in manim_args or "--save_last_frame" in manim_args:
+		return "png"
+	for i, arg in enumerate(manim_args):
+		if arg.startswith("--format="):
+			return arg.split("=", 1)[1]
+		if arg == "--format" and i + 1 < len(manim_args):
+			return manim_args[i + 1]
+	return "mp4"
+
+def get_format_args(media_format):
+	if media_format == "png":
+		return ["-s"]
+	return [f"--format={media_format}"]
+
+def get_output_path(scene, quality, media_format, media_dir):
+	# Where manim writes the scene, as laid out by its default config
+	module_name = os.path.splitext(os.path.basename(scene.file_name))[0]
+	if media_format == "png":
+		return os.path.join(
+			media_dir, "images", module_name,
+			f"{scene.name}_ManimCE_v{get_manim_version()}.png",
+		)
+	if media_format == "gif":
+		file_name = f"{scene.name}_ManimCE_v{get_manim_version()}.gif"
+	else:
+		file_name = f"{scene.name}.{media_format}"
+	return os.path.join(media_dir, "videos", module_name, QUALITY_DIRS[quality], file_name)
+
+def render_scene(scene, quality, manim_args, media_dir):
+	command = [
+		sys.executable, "-m", "manim", f"-q{quality}", "--media_dir", media_dir,
+		*manim_args, scene.file_name, scene.name,
+	]
+	start = time.perf_counter()
+	result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+	return scene, result, time.perf_counter() - start
+
+def get_parser():
+	parser = argparse.ArgumentParser(
+		description="Render the gallery scenes in parallel; unknown options are passed on to manim"
+	)
+	parser.add_argument("scenes", nargs="*", help="names of the scenes to render, all of them by default")
+	parser.add_argument("-q", "--quality", default="l", choices=["l", "m", "h", "p", "k"])
+	parser.add_argument("-j", "--processes", type=int, default=os.cpu_count())
+	parser.add_argument("--media_dir", default="media", help="where manim writes its output")
+	parser.add_argument(
+		"--update-media", action="store_true",
+		help=f"render the scenes shown in the README in their format and copy them to {gallery.MEDIA_DIR}"
+	)
+	parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+	parser.add_argument("--force", action="store_true", help="render scenes even when they have not changed")
+	return parser
+
+def main():
+	args, manim_args = get_parser().parse_known_args()
+	scenes = gallery.find_scenes()
+	if args.scenes:
+		scenes = [scene for scene in scenes if scene.name in args.scenes]
+	if args.update_media:
+		scenes = [scene for scene in scenes if get_media_format(scene)]
+	scenes.sort(key=lambda scene: scene.cost, reverse=True)
+
+	scene_args = {scene: manim_args for scene in scenes}
+	if args.update_media:
+		for scene in scenes:
+			scene_args[scene] = get_format_args(get_media_format(scene)) + manim_args
+
+	manifest = {}
+	if os.path.exists(args.manifest):
+		with open(args.manifest) as file:
+			manifest = json.load(file)
+	render_hashes = {
+		scene: get_render_hash(scene, args.quality, scene_args[scene])
+		for scene in scenes
+	}
+	for scene in scenes:
+		# A scene drawing unseeded random numbers never matches its last render
+		for call in scene.random_calls:
+			print(f"Unseeded random call in {os.path.basename(scene.file_name)} {scene.name}, {call}")
+	if not args.force:
+		unchanged = [
+			scene for scene in scenes
+			if not scene.random_calls
+			and manifest.get(get_manifest_key(scene, args.quality)) == render_hashes[scene]
+			and os.path.exists(get_output_path(
+				scene, args.quality, get_output_format(scene_args[scene]), args.media_dir,
+			))
+		]
+		for scene in unchanged:
+			print(f"{'':9} {'skip':6}  {os.path.basename(scene.file_name)} {scene.name}")
+		scenes = [scene for scene in scenes if scene not in unchanged]
+
+	failed = []
+	start = time.perf_counter()
+	with ThreadPoolExecutor(args.processes) as executor:
+		futures = [
+			executor.submit(render_scene, scene, args.quality, scene_args[scene], args.media_dir)
+			for scene in scenes
+		]
+		for future in as_completed(futures):
+			scene, result, wall_time = future.result()
+			status = "ok" if result.returncode == 0 else "failed"
+			print(f"{wall_time:8.1f}s  {status:6}  {os.path.basename(scene.file_name)} {scene.name}")
+			if result.returncode != 0:
+				failed.append(scene)
+				print(result.stdout)
+				continue
+			if args.update_media:
+				output_path = get_output_path(
+					scene, args.quality, get_output_format(scene_args[scene]), args.media_dir,
+				)
+				shutil.copy(output_path, gallery.MEDIA_DIR)
+			# Written after every scene, so an interrupted run keeps what it did
+			manifest[get_manifest_key(scene, args.quality)] = render_hashes[scene]
+			with open(args.manifest, "w") as file:
+				json.dump(manifest, file, indent=4, sort_keys=True)
+	print(f"{time.perf_counter() - start:8.1f}s  total for {len(scenes)} scenes")
+	return 1 if failed else 0
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -4,8 +4,413 @@ import math
 import scipy
 import random
 from sklearn import preprocessing
+from collections import OrderedDict
+import hashlib
+import os
+import tex_cache
+
+class MeshSurface(Surface):
+	# A Surface whose faces are given as point arrays, so rebuilding
+	# one skips evaluating the parametric function point by point
+
+	def __init__(
+		self, face_points, u_indices, v_indices,
+		u_range, v_range, resolution,
+		checkerboard_colors=[BLUE_D, BLUE_E],
+		fill_color=BLUE_D, fill_opacity=1.0,
+		stroke_color=LIGHT_GREY, stroke_width=0.5,
+		**kwargs
+	):
+		self.u_min, self.u_max = u_range
+		self.v_min, self.v_max = v_range
+		VGroup.__init__(self, **kwargs)
+		self.resolution = resolution
+		self.fill_color = fill_color
+		self.fill_opacity = fill_opacity
+		self.checkerboard_colors = checkerboard_colors
+		self.stroke_color = stroke_color
+		self.stroke_width = stroke_width
+		self.face_points = face_points
+		self.u_indices = u_indices
+		self.v_indices = v_indices
+		self.setup_in_uv_space()
+
+	def setup_in_uv_space(self):
+		u_values, v_values = self.get_u_values_and_v_values()
+		faces = VGroup()
+		for points, i, j in zip(self.face_points, self.u_indices, self.v_indices):
+			face = ThreeDVMobject()
+			face.set_points(points)
+			face.u_index = i
+			face.v_index = j
+			face.u1, face.u2 = u_values[i:i + 2]
+			face.v1, face.v2 = v_values[j:j + 2]
+			faces.add(face)
+		faces.set_fill(color=self.fill_color, opacity=self.fill_opacity)
+		faces.set_stroke(
+			color=self.stroke_color,
+			width=self.stroke_width,
+			opacity=self.stroke_opacity,
+		)
+		self.add(*faces)
+		if self.checkerboard_colors:
+			self.set_fill_by_checkerboard(*self.checkerboard_colors)
+
+# Part of the key of every mesh saved to disk; bump it whenever
+# get_grid_mesh builds different points, so old files are not served
+MESH_VERSION = 2
+
+class MeshCache:
+	# Face arrays of built surfaces, kept in memory (least recently
+	# used first out) and as .npz files under the media directory
+
+	def __init__(self, max_size=16):
+		self.max_size = max_size
+		self.meshes = OrderedDict()
+
+	def get_cache_dir(self):
+		cache_dir = os.path.join(config.get_dir("media_dir"), "mesh_cache")
+		os.makedirs(cache_dir, exist_ok=True)
+		return cache_dir
+
+	def get_path(self, key):
+		digest = hashlib.sha1(repr((MESH_VERSION, key)).encode()).hexdigest()
+		return os.path.join(self.get_cache_dir(), f"{digest}.npz")
+
+	def get(self, key, build_mesh):
+		if key in self.meshes:
+			self.meshes.move_to_end(key)
+			return self.meshes[key]
+
+		path = self.get_path(key)
+		if os.path.exists(path):
+			with np.load(path) as data:
+				mesh = {name: data[name] for name in data.files}
+		else:
+			mesh = build_mesh()
+			# Scenes rendered side by side may build the same mesh at once,
+			# each writes its own file and the first one to finish is kept
+			partial_path = f"{path}.{os.getpid()}.part"
+			with open(partial_path, "wb") as file:
+				np.savez(file, **mesh)
+			try:
+				os.replace(partial_path, path)
+			except OSError:
+				os.remove(partial_path)
+
+		self.meshes[key] = mesh
+		if len(self.meshes) > self.max_size:
+			self.meshes.popitem(last=False)
+		return mesh
+
+mesh_cache = MeshCache()
+
+def get_grid_mesh(func, u_range, v_range, resolution, handle_scale=0.00001):
+	# Same faces as Surface.setup_in_uv_space followed by apply_function,
+	# but with func evaluated once over every point of every face.
+	# As in VMobject.apply_function, the handles are pulled handle_scale
+	# of the way to their anchors, mapped and pushed back out, which
+	# turns them into finite difference tangents
+	res = tuplify(resolution)
+	if len(res) == 1:
+		u_res = v_res = res[0]
+	else:
+		u_res, v_res = res
+	u_values = np.linspace(*u_range, u_res + 1)
+	v_values = np.linspace(*v_range, v_res + 1)
+
+	u_indices, v_indices = np.divmod(np.arange(u_res * v_res), v_res)
+	u1, u2 = u_values[u_indices], u_values[u_indices + 1]
+	v1, v2 = v_values[v_indices], v_values[v_indices + 1]
+	# Corners (u1, v1) -> (u2, v1) -> (u2, v2) -> (u1, v2) -> (u1, v1)
+	corners = np.stack([
+		np.stack([u1, u2, u2, u1, u1], axis=-1),
+		np.stack([v1, v1, v2, v2, v1], axis=-1),
+	], axis=-1)
+	alphas = np.linspace(0, 1, 4)[:, np.newaxis]
+	curves = interpolate(
+		corners[:, :-1, np.newaxis], corners[:, 1:, np.newaxis], alphas,
+	)
+	anchors1, anchors2 = curves[:, :, 0], curves[:, :, 3]
+	curves[:, :, 1] = anchors1 + handle_scale * (curves[:, :, 1] - anchors1)
+	curves[:, :, 2] = anchors2 + handle_scale * (curves[:, :, 2] - anchors2)
+
+	points = np.moveaxis(
+		np.asarray(func(curves[..., 0], curves[..., 1]), dtype=float), 0, -1,
+	)
+	anchors1, anchors2 = points[:, :, 0], points[:, :, 3]
+	points[:, :, 1] = anchors1 + (1 / handle_scale) * (points[:, :, 1] - anchors1)
+	points[:, :, 2] = anchors2 + (1 / handle_scale) * (points[:, :, 2] - anchors2)
+	return {
+		"face_points": points.reshape(-1, 16, 3),
+		"u_indices": u_indices,
+		"v_indices": v_indices,
+	}
+
+def get_band_rings(func, u_range, v_range, resolution, **kwargs):
+	# A MeshSurface per band of u, in order of u, with the faces the whole
+	# surface would have there. Each band is evaluated on its own, so no
+	# full surface is built to be cut up; kwargs go to every ring
+	u_res, v_res = resolution
+	u_values = np.linspace(*u_range, u_res + 1)
+	rings = VGroup()
+	for k in range(u_res):
+		band_range = u_values[k:k + 2]
+		mesh = get_grid_mesh(func, band_range, v_range, (1, v_res))
+		rings.add(MeshSurface(
+			mesh["face_points"], mesh["u_indices"], mesh["v_indices"],
+			u_range=band_range, v_range=v_range, resolution=(1, v_res),
+			checkerboard_colors=None, **kwargs
+		))
+	return rings
+
+def get_face_centers(faces):
+	# Bounding box centers of many mobjects at once, matching get_center
+	lengths = [len(face.points) for face in faces]
+	points = np.concatenate([face.points for face in faces])
+	starts = np.cumsum([0, *lengths[:-1]])
+	return (np.minimum.reduceat(points, starts) + np.maximum.reduceat(points, starts)) / 2
+
+def get_half_space(group, normal, point=ORIGIN):
+	# The faces of group centered on the side of the plane through point
+	# that normal points to
+	faces = group.family_members_with_points()
+	if len(faces) == 0:
+		return VGroup()
+	centers = get_face_centers(faces)
+	in_half = np.dot(centers - point, normal) > 0
+	return VGroup(*[face for face, keep in zip(faces, in_half) if keep])
+
+def get_face_normals(face_points):
+	# Corner 0, 4, 8 and 12 of a face are (u1, v1), (u2, v1), (u2, v2),
+	# (u1, v2); crossing the diagonals gives the same orientation as the
+	# normals ThreeDCamera shades with, and stays defined at the poles
+	return normalize_along_axis(np.cross(
+		face_points[:, 8] - face_points[:, 0],
+		face_points[:, 12] - face_points[:, 4],
+	), 1)
+
+def get_outward_sign(normals, centers):
+	# Surface normals follow the (u, v) orientation, which may point
+	# inwards on a closed surface
+	return np.sign(np.sum(normals * (centers - centers.mean(axis=0))))
+
+def get_arc_points(start_angle, angle, radius=1, num_components=9):
+	# The points Arc would get for these arguments, in the xy-plane
+	angles = np.linspace(start_angle, start_angle + angle, num_components)
+	zeros = np.zeros(num_components)
+	anchors = radius * np.array([np.cos(angles), np.sin(angles), zeros]).T
+	tangents = radius * np.array([-np.sin(angles), np.cos(angles), zeros]).T
+	d_theta = angle / (num_components - 1)
+	points = np.empty((num_components - 1, 4, 3))
+	points[:, 0] = anchors[:-1]
+	points[:, 1] = anchors[:-1] + (d_theta / 3) * tangents[:-1]
+	points[:, 2] = anchors[1:] - (d_theta / 3) * tangents[1:]
+	points[:, 3] = anchors[1:]
+	return points.reshape(-1, 3)
+
+def apply_matrix_to_family(mobject, matrix):
+	# Transforms the points of every family member with one matmul. A 4x4
+	# matrix is taken as an affine transform of homogeneous points
+	family = mobject.family_members_with_points()
+	if len(family) == 0:
+		return mobject
+	matrix = np.asarray(matrix, dtype=float)
+	points = np.concatenate([mob.points for mob in family])
+	if matrix.shape == (4, 4):
+		points = points @ matrix[:3, :3].T + matrix[:3, 3]
+	else:
+		points = points @ matrix.T
+	lengths = [len(mob.points) for mob in family]
+	for mob, mob_points in zip(family, np.split(points, np.cumsum(lengths)[:-1])):
+		mob.points = mob_points
+	return mobject
+
+class SphereMesh(VGroup):
+	# A closed surface drawn as one VMobject per shade level rather than
+	# one per face. Every frame the faces turned towards the camera are
+	# shaded like ThreeDCamera would, bucketed by brightness and packed
+	# as subpaths of their level's VMobject. Faces are kept in place, so
+	# the mesh is meant to stay still while the camera moves around it
+	n_shade_levels = 64
+
+	def __init__(
+		self, face_points, camera, color=BLUE_E,
+		fill_opacity=1.0, stroke_width=0.5,
+		**kwargs
+	):
+		VGroup.__init__(self, **kwargs)
+		self.face_points = np.asarray(face_points, dtype=float)
+		self.camera = camera
+		self.base_rgb = color_to_rgb(color)
+		self.camera_state = None
+
+		self.face_centers = self.face_points.mean(axis=1)
+		self.face_normals = get_face_normals(self.face_points)
+		self.outward_sign = get_outward_sign(self.face_normals, self.face_centers)
+
+		self.shade_factors = np.linspace(-0.25, 0.5, self.n_shade_levels)
+		self.layers = [VMobject() for level in range(self.n_shade_levels)]
+		for layer, factor in zip(self.layers, self.shade_factors):
+			color = rgb_to_color(np.clip(self.base_rgb + factor, 0, 1))
+			layer.set_fill(color, opacity=fill_opacity)
+			layer.set_stroke(color, width=stroke_width)
+		self.add(*self.layers)
+		self.add_updater(lambda m: m.update_faces())
+		self.update_faces()
+
+	def update_faces(self):
+		camera = self.camera
+		rot_matrix = camera.generate_rotation_matrix()
+		light_source = camera.light_source.get_center()
+		camera_point = camera.frame_center + camera.get_distance() * rot_matrix[2]
+		camera_state = (camera_point.tobytes(), light_source.tobytes())
+		if camera_state == self.camera_state:
+			return self
+		self.camera_state = camera_state
+
+		to_camera = camera_point - self.face_centers
+		visible = self.outward_sign * np.sum(self.face_normals * to_camera, axis=1) > 0
+		normals = self.face_normals[visible]
+		if camera.should_apply_shading:
+			to_sun = normalize_along_axis(light_source - self.face_centers[visible], 1)
+			factors = 0.5 * np.sum(normals * to_sun, axis=1)**3
+			factors[factors < 0] *= 0.5
+		else:
+			factors = np.zeros(len(normals))
+
+		levels = np.searchsorted(
+			(self.shade_factors[1:] + self.shade_factors[:-1]) / 2, factors
+		)
+		order = np.argsort(levels, kind="stable")
+		counts = np.bincount(levels, minlength=self.n_shade_levels)
+		face_groups = np.split(self.face_points[visible][order], np.cumsum(counts)[:-1])
+		for layer, faces in zip(self.layers, face_groups):
+			layer.set_points(faces.reshape(-1, 3))
+		return self
+
+class CulledSurface:
+	# Normals and opacities of a closed surface's faces, taken once at the
+	# start of each play. Faces are only culled during plays that leave
+	# the surface alone, so every frame just compares them with the camera
+
+	def __init__(self, surface):
+		self.surface = surface
+		self.is_still = False
+
+	def refresh(self, animated_ids):
+		faces = self.surface.submobjects
+		self.is_still = (
+			len(faces) > 0
+			and id(self.surface) not in animated_ids
+			and not any(id(face) in animated_ids for face in faces)
+			and len(self.surface.get_family_updaters()) == 0
+			and all(len(face.points) == 16 for face in faces)
+		)
+		if not self.is_still:
+			return
+		points = np.array([face.points for face in faces])
+		self.face_ids = np.array([id(face) for face in faces])
+		self.opaque = np.array([face.fill_rgbas[0, 3] >= 1 for face in faces])
+		self.corners = points[:, [0, 4, 8, 12]]
+		self.normals = get_face_normals(points)
+		self.outward_sign = get_outward_sign(self.normals, points.mean(axis=1))
+
+	def get_hidden_faces(self, camera_point):
+		if not self.is_still:
+			return []
+		# Only faces turned away at all four corners, and opaque
+		to_camera = camera_point - self.corners
+		facing = self.outward_sign * np.einsum("ij,ikj->ik", self.normals, to_camera)
+		hidden = np.all(facing < 0, axis=1) & self.opaque
+		return self.face_ids[hidden]
+
+class SphereCamera(ThreeDCamera):
+	# Same drawing order as ThreeDCamera, but depths come from one array
+	# of centers instead of a get_center call per face, and the sort
+	# starts from last frame's order, which a slowly turning camera barely
+	# changes and a stable sort (timsort) repairs in close to linear time
+
+	def __init__(self, **kwargs):
+		ThreeDCamera.__init__(self, **kwargs)
+		self.previous_ranks = {}
+		self.culled_surfaces = []
+
+	def add_culled_surface(self, surface):
+		# Faces of surface turned away from the camera are skipped, for as
+		# long as they are opaque. Only meant for closed surfaces that stay
+		# on screen, and that only animations of their own change
+		self.culled_surfaces.append(CulledSurface(surface))
+
+	def refresh_culled_surfaces(self, animated_ids):
+		for culled in self.culled_surfaces:
+			culled.refresh(animated_ids)
+
+	def get_hidden_faces(self):
+		rot_matrix = self.get_rotation_matrix()
+		camera_point = self.frame_center + self.get_distance() * rot_matrix[2]
+		return set(
+			face_id
+			for culled in self.culled_surfaces
+			for face_id in culled.get_hidden_faces(camera_point)
+		)
+
+	def get_depths(self, mobjects):
+		# Faces without submobjects are centered on their own points;
+		# anything else keeps its own reference point
+		centers = np.empty((len(mobjects), 3))
+		simple = np.array([
+			len(mob.submobjects) == 0 and not hasattr(mob, "z_index_group")
+			for mob in mobjects
+		])
+		if simple.any():
+			centers[simple] = get_face_centers([
+				mob for mob, is_simple in zip(mobjects, simple) if is_simple
+			])
+		for i in np.flatnonzero(~simple):
+			centers[i] = mobjects[i].get_z_index_reference_point()
+		return centers @ self.get_rotation_matrix()[2]
+
+	def get_mobjects_to_display(self, *args, **kwargs):
+		mobjects = Camera.get_mobjects_to_display(self, *args, **kwargs)
+		if self.culled_surfaces:
+			hidden = self.get_hidden_faces()
+			mobjects = [mob for mob in mobjects if id(mob) not in hidden]
+		shaded = [mob for mob in mobjects if getattr(mob, "shade_in_3d", False)]
+		flat = [mob for mob in mobjects if not getattr(mob, "shade_in_3d", False)]
+		if len(shaded) == 0:
+			self.previous_ranks = {}
+			return flat
+
+		n_ranked = len(self.previous_ranks)
+		ranks = [
+			self.previous_ranks.get(id(mob), n_ranked + i)
+			for i, mob in enumerate(shaded)
+		]
+		shaded = [shaded[i] for i in np.argsort(ranks, kind="stable")]
+		order = np.argsort(self.get_depths(shaded), kind="stable")
+		shaded = [shaded[i] for i in order]
+		self.previous_ranks = {id(mob): i for i, mob in enumerate(shaded)}
+		return shaded + flat
 
 class SphereScene(ThreeDScene):
+	use_lod = False
+	lod_pixels_per_face = 4
+	cull_back_faces = False
+
+	def __init__(self, camera_class=SphereCamera, **kwargs):
+		ThreeDScene.__init__(self, camera_class=camera_class, **kwargs)
+
+	def compile_animation_data(self, *animations, **play_kwargs):
+		result = ThreeDScene.compile_animation_data(self, *animations, **play_kwargs)
+		if self.cull_back_faces:
+			animated_ids = set(
+				id(mob)
+				for animation in self.animations
+				for mob in animation.mobject.get_family()
+			)
+			self.camera.refresh_culled_surfaces(animated_ids)
+		return result
 
 	def get_ghost_surface(self, surface):
 		result = surface.copy()
@@ -17,36 +422,72 @@ class SphereScene(ThreeDScene):
 		ax = ThreeDAxes()
 		return ax
 
-	def get_smooth_sphere(self, color):
-		sm_sphere = ParametricSurface(
-			lambda u, v: np.array([
-				1.5 * np.cos(u) * np.cos(v),
-				1.5 * np.cos(u) * np.sin(v),
-				1.5 * np.sin(u)
-			]), v_range=[0, TAU], u_range=[-PI / 2, PI / 2],
-			checkerboard_colors=[color, color], resolution=(150,150)
+	def get_sphere_func(self, radius):
+		return lambda u, v: np.array([
+			radius * np.cos(u) * np.cos(v),
+			radius * np.cos(u) * np.sin(v),
+			radius * np.sin(u)
+		])
+
+	def get_sphere_faces(self, resolution, radius=1.5):
+		u_range = [-PI / 2, PI / 2]
+		v_range = [0, TAU]
+		key = ("sphere", radius, tuple(u_range), tuple(v_range), tuple(resolution))
+
+		def build_mesh():
+			return get_grid_mesh(
+				self.get_sphere_func(radius), u_range, v_range, resolution,
+			)
+
+		return mesh_cache.get(key, build_mesh)
+
+	def get_cached_sphere(self, checkerboard_colors, resolution, radius=1.5):
+		mesh = self.get_sphere_faces(resolution, radius)
+		return MeshSurface(
+			mesh["face_points"], mesh["u_indices"], mesh["v_indices"],
+			u_range=[-PI / 2, PI / 2], v_range=[0, TAU],
+			checkerboard_colors=checkerboard_colors, resolution=resolution
 		)
+
+	def get_lod_resolution(self, radius, max_resolution):
+		# Faces about lod_pixels_per_face pixels long at the current render
+		# quality, never finer than max_resolution
+		pixels_per_unit = config.pixel_height / config.frame_height
+		diameter = 2 * radius * self.camera.get_zoom() * pixels_per_unit
+		u_res = int(np.ceil(PI * diameter / 2 / self.lod_pixels_per_face))
+		v_res = int(np.ceil(PI * diameter / self.lod_pixels_per_face))
+		max_u, max_v = max_resolution
+		return (min(max(u_res, 6), max_u), min(max(v_res, 12), max_v))
+
+	def get_sphere_mesh(self, color, resolution, radius=1.5):
+		if self.use_lod:
+			resolution = self.get_lod_resolution(radius, resolution)
+		mesh = self.get_sphere_faces(resolution, radius)
+		return SphereMesh(mesh["face_points"], self.camera, color=color)
+
+	def get_smooth_sphere(self, color):
+		sm_sphere = self.get_cached_sphere([color, color], (150, 150))
 		sm_sphere.set_opacity(0.8)
 		sm_sphere.set_stroke(color, opacity=0.8)
 		return sm_sphere
 
 	def get_sphere(self, color_a, color_b, a, b):
-		sphere = ParametricSurface(
-			lambda u, v: np.array([
-				1.5 * np.cos(u) * np.cos(v),
-				1.5 * np.cos(u) * np.sin(v),
-				1.5 * np.sin(u)
-			]), v_range=[0, TAU], u_range=[-PI / 2, PI / 2],
-			checkerboard_colors=[color_a, color_b], resolution=(a, b)
-		)
+		sphere = self.get_cached_sphere([color_a, color_b], (a, b))
+		if self.cull_back_faces:
+			self.camera.add_culled_surface(sphere)
 		return sphere
 
-	def get_rings(self, mob):
-		u_values, v_values = mob.get_u_values_and_v_values()
-		inv_rings = VGroup(*[VGroup() for u in u_values])
-		for piece in mob:
-			inv_rings[piece.u_index].add(piece.copy())
-		rings = inv_rings[::-1]
+	def get_projection(self, mobject, matrix):
+		return apply_matrix_to_family(mobject.copy(), matrix)
+
+	def get_sphere_rings(self, resolution, radius=1.5, **kwargs):
+		# One band of latitude per ring, south to north
+		return get_band_rings(
+			self.get_sphere_func(radius), [-PI / 2, PI / 2], [0, TAU], resolution, **kwargs
+		)
+
+	def get_rings(self, resolution, radius=1.5):
+		rings = self.get_sphere_rings(resolution, radius)[::-1]
 		self.set_ring_colors_new(rings)
 		self.rings = rings
 
@@ -64,17 +505,22 @@ class RectangulatedSphere(SphereScene):
 	wait_time = 10
 	a = 10
 	b = 20
+	cull_back_faces = True
 
 	def construct(self):
-		sphere = self.get_sphere(BLUE_D, BLUE_C, self.a, self.b)
-		if self.uniform_color:
-			sphere.set_stroke(BLUE_E, width=0.5)
-			sphere.set_fill(BLUE_E)
 		self.set_camera_orientation(phi=75 * DEGREES, theta=30 * DEGREES)
+		sphere = self.get_surface()
 		self.begin_ambient_camera_rotation(0.05)
 		self.add(sphere)
 		self.wait(self.wait_time)
 
+	def get_surface(self):
+		sphere = self.get_sphere(BLUE_D, BLUE_C, self.a, self.b)
+		if self.uniform_color:
+			sphere.set_stroke(BLUE_E, width=0.5)
+			sphere.set_fill(BLUE_E)
+		return sphere
+
 
 class SmoothSphere(RectangulatedSphere):
 	#CONFIG
@@ -82,6 +528,13 @@ class SmoothSphere(RectangulatedSphere):
 	wait_time = 0
 	a = 150
 	b = 250
+	use_mesh = True
+	use_lod = True
+
+	def get_surface(self):
+		if self.use_mesh:
+			return self.get_sphere_mesh(BLUE_E, (self.a, self.b))
+		return RectangulatedSphere.get_surface(self)
 
 class RotateAllPiecesWithExpansion(SphereScene):
 
@@ -138,7 +591,7 @@ class RotateAllPiecesWithoutExpansion(RotateAllPiecesWithExpansion):
 
 	with_expansion = False
 
-class Ring(SphereScene):
+class Ring(tex_cache.GlyphCacheScene, SphereScene):
 
 	n_random_subsets = 12
 	a = 30
@@ -158,10 +611,8 @@ class Ring(SphereScene):
 		self.add(sphere)
 		self.sphere = sphere
 
-		u_values, v_values = sphere.get_u_values_and_v_values()
-		rings = VGroup(*[VGroup() for u in u_values])
-		for piece in sphere:
-			rings[piece.u_index].add(piece.copy())
+		# Styled as the sphere is, like copies of its faces would be
+		rings = self.get_sphere_rings((self.a, self.b), stroke_color=WHITE, stroke_width=0.25)
 		self.set_ring_colors_new(rings)
 		self.rings = rings
 
@@ -317,8 +768,9 @@ class Ring(SphereScene):
 	def show_theta(self):
 		theta_tracker = ValueTracker(0)
 		get_theta = theta_tracker.get_value
-		theta_group = always_redraw(
-			lambda: self.get_theta_group(get_theta())
+		theta_group = self.get_theta_group(get_theta())
+		theta_group.add_updater(
+			lambda g: self.update_theta_group(g, get_theta())
 		)
 		theta_mob_opacity_tracker = ValueTracker(0)
 		get_theta_mob_opacity = theta_mob_opacity_tracker.get_value
@@ -332,17 +784,18 @@ class Ring(SphereScene):
 			)
 		)
 
-		lit_ring = always_redraw(
-			lambda: self.get_ring_from_theta(
-				self.rings, get_theta()
-			).copy().set_color(YELLOW)
+		lit_ring = VGroup()
+		lit_ring.add_updater(
+			lambda m: self.light_ring(
+				m, self.get_ring_from_theta(self.rings, get_theta())
+			)
 		)
 
 		self.stop_ambient_camera_rotation()
 		self.move_camera(theta=-60 * DEGREES)
 
 		self.add(theta_group, lit_ring)
-		n_rings = len(self.rings) - 1
+		n_rings = len(self.rings)
 		lit_ring_index = int((30 / 180) * n_rings)
 		angle = PI * lit_ring_index / n_rings
 		for alpha in [angle, 0, PI, angle]:
@@ -447,23 +900,10 @@ class Ring(SphereScene):
 			rings[i].set_color(colors[i])
 
 	def get_shadow(self, mobject):
-		result = mobject.copy()
-		result.apply_function(
-			lambda p: np.array([*p[:2], 0])
-		)
-		return result
+		return self.get_projection(mobject, np.diag([1, 1, 0]))
 
 	def get_hemisphere(self, group, vect):
-		if len(group.submobjects) == 0:
-			if np.dot(group.get_center(), vect) > 0:
-				return group
-			else:
-				return VMobject()
-		else:
-			return VGroup(*[
-				self.get_hemisphere(submob, vect)
-				for submob in group
-			])
+		return get_half_space(group, vect)
 
 	def get_northern_hemisphere(self, group):
 		return self.get_hemisphere(group, OUT)
@@ -498,6 +938,32 @@ class Ring(SphereScene):
 
 		return Group(arc, radial_line, theta_mob)
 
+	def update_theta_group(self, theta_group, theta):
+		# Moves the pieces of a get_theta_group result to a new theta
+		# without building new mobjects
+		arc, radial_line, theta_mob = theta_group
+		arc.points[:] = get_arc_points(
+			90 * DEGREES, -theta, arc.radius, arc.num_components
+		)[:, [0, 2, 1]]
+		radial_line.put_start_and_end_on(ORIGIN, 1.5 * normalize(arc.points[-1]))
+		vect = np.cos(theta / 2) * OUT + np.sin(theta / 2) * RIGHT
+		theta_mob.move_to((arc.radius + 0.25) * normalize(vect))
+		return theta_group
+
+	def light_ring(self, lit_ring, ring, color=YELLOW):
+		# Recolors ring in place and shows it whole through lit_ring, as
+		# only part of it may be on screen; the ring lit before it gets
+		# its own color back and leaves lit_ring
+		previous = lit_ring.submobjects[0] if lit_ring.submobjects else None
+		if previous is ring:
+			return lit_ring
+		if previous is not None:
+			previous.set_color(previous.unlit_color)
+		ring.unlit_color = ring.get_color()
+		ring.set_color(color)
+		lit_ring.submobjects = [ring]
+		return lit_ring
+
 	def get_ring_from_theta(self, rings, theta):
 		n_rings = len(rings)
 		index = min(int((theta / PI) * n_rings), n_rings - 1)
@@ -525,7 +991,7 @@ class SphereAnim(Ring):
 		ax = self.get_ax()
 		sphere = self.get_sphere(BLUE_E, BLUE_D, self.a, self.b)
 		ghost_sphere = self.get_ghost_surface(sphere)
-		rings = self.get_rings(sphere)
+		rings = self.get_rings((self.a, self.b))
 		ghost_sphere.scale(0.99)
 		discs = VGroup(*[
 			Circle(fill_opacity=1)
@@ -592,10 +1058,7 @@ class SphereAnim(Ring):
 		north_rings = rings[:len(rings) // 2]
 		sphere.set_fill(opacity=0)
 		sphere.set_stroke(WHITE, 0.5, opacity=0.5)
-		southern_mesh = VGroup(*[
-			face.copy() for face in sphere
-			if face.get_center()[2] < 0
-		])
+		southern_mesh = get_half_space(sphere, IN).copy()
 		southern_mesh.set_stroke(WHITE, 0.1, 0.5)
 
 		#self.play(Write(sphere))
@@ -0,0 +1,189 @@
+from manim import*
+import numpy as np
+import hashlib
+import os
+import ast
+import glob
+import argparse
+import contextlib
+import multiprocessing
+from manim.mobject.svg.style_utils import parse_style
+
+# Parsed glyph paths of compiled Tex/MathTex, stored as .npz files named
+# after the hash of the SVG they came from. LaTeX output for an expression
+# is already kept by manim, so the cache skips parsing that SVG again.
+# Nothing changes on import: scenes mix in GlyphCacheScene, tools use
+# installed(), to have SingleStringMathTex read from the cache
+
+TEX_CLASSES = ["Tex", "MathTex", "SingleStringMathTex"]
+# Keyword arguments that change which SVGs a Tex call compiles, the
+# others only style the result
+TEX_OPTIONS = ["tex_environment", "arg_separator", "substrings_to_isolate", "tex_to_color_map"]
+# Part of every cache file name; bump it when the saved layout changes
+GLYPH_VERSION = 2
+# Classes SVGMobject builds glyphs from, by the name saved for each
+# member of the family; anything else comes back as a VMobject
+GLYPH_CLASSES = {
+	"SVGPathMobject": lambda **style: SVGPathMobject("", **style),
+	"Rectangle": Rectangle,
+	"RoundedRectangle": RoundedRectangle,
+	"Line": Line,
+	"Circle": Circle,
+}
+
+parse_svg_points = SVGMobject.generate_points
+# What install() replaces, None when the method is inherited
+own_generate_points = SingleStringMathTex.__dict__.get("generate_points")
+
+def get_cache_dir():
+	cache_dir = os.path.join(config.get_dir("media_dir"), "glyph_cache")
+	os.makedirs(cache_dir, exist_ok=True)
+	return cache_dir
+
+def get_glyph_path(svg_file):
+	with open(svg_file, "rb") as file:
+		digest = hashlib.sha256(file.read()).hexdigest()
+	return os.path.join(get_cache_dir(), f"{digest}_v{GLYPH_VERSION}.npz")
+
+def save_glyphs(mobject, path):
+	# Family in depth first order, with the number of children, class and
+	# stroke width of each member, is enough to rebuild the tree
+	family = mobject.get_family()
+	# Prewarm workers and scenes rendered side by side may save the same
+	# glyphs at once, each writes its own file and one of them is kept
+	partial_path = f"{path}.{os.getpid()}.part"
+	with open(partial_path, "wb") as file:
+		np.savez(
+			file,
+			points=np.concatenate([mob.points.reshape(-1, 3) for mob in family]),
+			lengths=[len(mob.points) for mob in family],
+			n_children=[len(mob.submobjects) for mob in family],
+			class_names=[type(mob).__name__ for mob in family],
+			stroke_widths=[mob.get_stroke_width() for mob in family],
+		)
+	try:
+		os.replace(partial_path, path)
+	except OSError:
+		os.remove(partial_path)
+
+def load_glyphs(mobject, path):
+	with np.load(path) as data:
+		lengths = data["lengths"]
+		points = np.split(data["points"], np.cumsum(lengths)[:-1])
+		n_children = data["n_children"]
+		class_names = data["class_names"]
+		stroke_widths = data["stroke_widths"]
+	nodes = iter(zip(points, n_children, class_names, stroke_widths))
+	# Glyphs in LaTeX's SVGs carry no style of their own, so they get the
+	# one SVGMobject would hand down from the Tex mobject
+	style = parse_style(mobject.generate_style())
+
+	def build(mob, n):
+		mob.add(*[build_child() for i in range(n)])
+		return mob
+
+	def build_child():
+		mob_points, n, class_name, stroke_width = next(nodes)
+		glyph_class = GLYPH_CLASSES.get(str(class_name), VMobject)
+		mob = glyph_class(**{**style, "stroke_width": float(stroke_width)})
+		mob.set_points(mob_points)
+		return build(mob, n)
+
+	mob_points, n, class_name, stroke_width = next(nodes)
+	mobject.set_points(mob_points)
+	return build(mobject, n)
+
+def generate_points(self):
+	path = get_glyph_path(self.file_path)
+	if os.path.exists(path):
+		load_glyphs(self, path)
+	else:
+		parse_svg_points(self)
+		save_glyphs(self, path)
+
+def install():
+	SingleStringMathTex.generate_points = generate_points
+
+def uninstall():
+	if own_generate_points is None:
+		if "generate_points" in SingleStringMathTex.__dict__:
+			del SingleStringMathTex.generate_points
+	else:
+		SingleStringMathTex.generate_points = own_generate_points
+
+@contextlib.contextmanager
+def installed():
+	# Leaves SingleStringMathTex as it found it, so nested uses are fine
+	was_installed = SingleStringMathTex.generate_points is generate_points
+	install()
+	try:
+		yield
+	finally:
+		if not was_installed:
+			uninstall()
+
+class GlyphCacheScene:
+	# Put before the Scene class in a scene's bases to render it with
+	# the cache installed
+
+	def render(self, *args, **kwargs):
+		with installed():
+			return super().render(*args, **kwargs)
+
+def get_literal(node):
+	try:
+		return ast.literal_eval(node)
+	except ValueError:
+		return None
+
+def find_tex_calls(file_names):
+	# (class name, strings, options) of every Tex-like call whose strings
+	# and TEX_OPTIONS are all literals. Strings built at run time, as in
+	# InfiniteSum or StackRect, cannot be found this way and are compiled
+	# on the scene's first render instead
+	calls = set()
+	for file_name in file_names:
+		with open(file_name) as file:
+			tree = ast.parse(file.read(), file_name)
+		for node in ast.walk(tree):
+			if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Name):
+				continue
+			if node.func.id not in TEX_CLASSES or len(node.args) == 0:
+				continue
+			strings = []
+			for arg in node.args:
+				# Literal lists and tuples unpacked into the call count too
+				value = get_literal(arg.value if isinstance(arg, ast.Starred) else arg)
+				if isinstance(arg, ast.Starred) and isinstance(value, (list, tuple)):
+					strings += value
+				else:
+					strings.append(value)
+			options = [
+				(keyword.arg, get_literal(keyword.value)) for keyword in node.keywords
+				if keyword.arg in TEX_OPTIONS
+			]
+			if all(isinstance(string, str) for string in strings) and None not in dict(options).values():
+				calls.add((node.func.id, tuple(strings), repr(sorted(options))))
+	return sorted(calls)
+
+def prewarm(call):
+	class_name, strings, options = call
+	install()
+	globals()[class_name](*strings, **dict(ast.literal_eval(options)))
+	return call
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(
+		description="Compile the Tex and MathTex strings of the gallery scenes into the glyph cache"
+	)
+	parser.add_argument(
+		"files", nargs="*",
+		default=glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*.py"))
+	)
+	parser.add_argument("-j", "--processes", type=int, default=os.cpu_count())
+	args = parser.parse_args()
+
+	calls = find_tex_calls(args.files)
+	with multiprocessing.Pool(args.processes) as pool:
+		for class_name, strings, options in pool.imap_unordered(prewarm, calls):
+			print(f"{class_name}{strings}")